@@ -0,0 +1,328 @@
+#! /usr/bin/env python3
+#coding=utf-8
+
+r'''Benchmark of the WBXML decoder over a synthetic document corpus.
+
+    Documents are generated for each application shipped with DeWBXML, in a
+    number of profiles varying document size, nesting depth and string reuse
+    (and thus use of the string table). Generation is deterministic for a
+    given seed, so results of different runs are comparable.
+
+    For each application and profile, decode throughput (documents and
+    megabytes per second), the time spent on each parsing phase and the peak
+    memory use of the process decoding it are reported. Each case is run in
+    a fresh process, so peak memory figures don't carry over between cases.
+    Throughput is measured without instrumentation; phase times and token
+    counts are collected by separate runs with a wbxmlstats object.
+
+    The program is invoked from command line as below:
+
+        benchmark.py [-n repeat] [-a application] [-p profile] [-s seed]
+                     [-o results.json] [-b baseline.json] [-c]
+
+    Options -a and -p can be given multiple times to select cases; all are
+    run by default. Results are written as JSON to the file given with -o,
+    and compared against a previously saved results file given with -b.
+    With -c, documents are decoded by compiled decoders (see wbxmlcompiler)
+    instead of the generic decoding loop.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+__version__ = '1.0.0'
+
+import activesync
+import provisioning
+import rightsobjects
+import syncml12
+import wml13
+
+from dewbxml import wbxmlapplication, wbxmlcompiler, wbxmlelement, wbxmlparser, wbxmlstats, wbxmlstring
+from dewbxml import _FIXED, _TABLE
+from enwbxml import wbxmlencoder
+
+from getopt  import getopt
+from json    import dump, load
+from random  import Random
+from sys     import stdout, version
+from timeit  import default_timer as timer
+
+
+_applications = {
+    'activesync': (0x01, activesync.encoding),
+    'provisioning': (0x0B, provisioning.encoding),
+    'rightsobjects': (0x0E, rightsobjects.encoding),
+    'syncml12': (0x1201, syncml12.encoding),
+    'wml13': (0x04, wml13.encoding)
+}
+
+# Document profiles: number of elements, maximum nesting depth, probability
+# of nesting a new element under the last one added (instead of a random
+# one), and number of distinct strings (None for all strings unique).
+_profiles = {
+    'small': {'elements': 20, 'depth': 4, 'nesting': 0.3, 'vocabulary': 50},
+    'medium': {'elements': 500, 'depth': 8, 'nesting': 0.3, 'vocabulary': 200},
+    'large': {'elements': 5000, 'depth': 16, 'nesting': 0.3, 'vocabulary': 1000},
+    'deep': {'elements': 2000, 'depth': 500, 'nesting': 0.9, 'vocabulary': 200},
+    'shared': {'elements': 1000, 'depth': 8, 'nesting': 0.3, 'vocabulary': 10},
+    'unique': {'elements': 1000, 'depth': 8, 'nesting': 0.3, 'vocabulary': None}
+}
+
+_letters = 'abcdefghijklmnopqrstuvwxyz'
+
+_affixes = ['http://', 'http://www.', 'https://', '.com/', '.org/', '']
+
+
+def _word(random):
+    r'''Returns a random string, sometimes looking like a URL so attribute
+        value tokens get used where the application defines them.
+    '''
+    word = ''.join(random.choice(_letters) for i in range(random.randint(3, 12)))
+    if random.random() < 0.2:
+        word = random.choice(_affixes) + word + random.choice(_affixes)
+
+    return word
+
+
+def generate(encoding, profile, seed = 0):
+    r'''Generates a random WBXML DOM tree for the given application according
+        to a document profile, returning its root element.
+    '''
+    random = Random(seed)
+    application = wbxmlapplication(encoding)
+
+    # Element name -> list of attribute specifications (name, kind, value)
+    elements = {}
+    for (page, tokens) in enumerate(application.elements):
+        for element in tokens:
+            if element == None:
+                continue
+
+            (tag, name) = element[:2]
+            specs = elements.setdefault(name, [])
+            values = application.attributes[page][tag]
+            if values != None:
+                specs.extend(spec for spec in values if spec != None and spec not in specs)
+
+    names = sorted(elements)
+
+    size = profile['vocabulary']
+    vocabulary = [_word(random) for i in range(size)] if size != None else None
+
+    def string():
+        if vocabulary == None:
+            return _word(random) + str(random.randint(0, 1 << 30))
+        return random.choice(vocabulary)
+
+    def element(name):
+        node = wbxmlelement(name)
+        specs = elements[name]
+        for i in range(min(len(specs), random.randint(0, 3))):
+            (attribute, kind, value) = random.choice(specs)
+            if kind == _FIXED:
+                node.attributes[attribute] = value
+            elif kind == _TABLE:
+                node.attributes[attribute] = random.choice(sorted(value.values()))
+            else:
+                node.attributes[attribute] = string()
+
+        return node
+
+    # The DTD's root element, or if it's not an element of the application
+    # (as for ActiveSync, whose documents have different roots), the first
+    # element of the first page.
+    name = encoding['dtd'].split()[0]
+    if name not in elements:
+        name = next(element[1] for element in application.elements[0] if element != None)
+
+    root = element(name)
+    nodes = [(root, 1)]
+    for i in range(profile['elements'] - 1):
+        (parent, depth) = nodes[-1]
+        if random.random() >= profile['nesting'] or depth >= profile['depth']:
+            (parent, depth) = random.choice(nodes)
+            if depth >= profile['depth']:
+                (parent, depth) = nodes[0]
+
+        node = element(random.choice(names))
+        parent.addchild(node)
+        if random.random() < 0.5:
+            node.addchild(wbxmlstring(string()))
+
+        nodes.append((node, depth + 1))
+
+    return root
+
+
+def _peakmemory():
+    r'''Returns the peak resident memory of the current process in kilobytes
+        (as reported by the system), or None if it can't be measured.
+    '''
+    try:
+        from resource import getrusage, RUSAGE_SELF
+    except ImportError:
+        return None
+
+    return getrusage(RUSAGE_SELF).ru_maxrss
+
+
+def run(case):
+    r'''Runs a single benchmark case, given as a tuple (application name,
+        profile name, seed, repeat, compiled), and returns a dictionary of
+        results. Times are given in seconds per document.
+    '''
+    (name, profile, seed, repeat, compiled) = case
+    (publicid, encoding) = _applications[name]
+    root = generate(encoding, _profiles[profile], seed)
+    data = bytearray(wbxmlencoder(publicid, encoding).encode(root))
+
+    parser = wbxmlparser({publicid: encoding}, compiler = wbxmlcompiler() if compiled else None)
+
+    # Applications are compiled on first use, so that's left out of timing.
+    parser.parse(data, True)
+
+    decode = 0.0
+    serialize = 0.0
+    for i in range(repeat):
+        start = timer()
+        doc = parser.parse(data, True)
+        decode += timer() - start
+
+        start = timer()
+        str(doc)
+        serialize += timer() - start
+
+    stats = wbxmlstats()
+    for i in range(repeat):
+        parser.parse(data, True, stats)
+
+    phases = dict((phase, time / repeat) for (phase, time) in stats.phases.items())
+    phases['serialization'] = serialize / repeat
+
+    return {
+        'application': name,
+        'profile': profile,
+        'bytes': len(data),
+        'elements': _profiles[profile]['elements'],
+        'docs_per_s': repeat / decode,
+        'mb_per_s': repeat * len(data) / decode / 1e6,
+        'phases': phases,
+        'tokens': dict((token, count // repeat) for (token, count) in stats.tokens.items()),
+        'stringtable_hits': sum(stats.hits.values()) // repeat,
+        'peak_memory_kb': _peakmemory()
+    }
+
+
+def benchmark(applications = None, profiles = None, seed = 0, repeat = 20, compiled = False):
+    r'''Runs the benchmark for the given application and profile names (all
+        of them by default), and returns a dictionary of results.
+    '''
+    from multiprocessing import Pool
+
+    cases = []
+    for name in sorted(applications or _applications):
+        for profile in sorted(profiles or _profiles):
+            cases.append((name, profile, seed, repeat, compiled))
+
+    pool = Pool(1, maxtasksperchild = 1)
+    try:
+        results = list(pool.imap(run, cases))
+    finally:
+        pool.close()
+        pool.join()
+
+    return {
+        'python': version.split()[0],
+        'seed': seed,
+        'repeat': repeat,
+        'compiled': compiled,
+        'results': results
+    }
+
+
+def report(results, baseline = None, out = stdout):
+    r'''Writes a table of benchmark results, compared against the results of
+        a baseline run if given.
+    '''
+    previous = {}
+    if baseline != None:
+        for result in baseline['results']:
+            previous[(result['application'], result['profile'])] = result
+
+    out.write('%-14s %-8s %8s %9s %7s %9s %9s %9s %9s %9s' % (
+        'application', 'profile', 'bytes', 'docs/s', 'MB/s',
+        'header', 'strings', 'body', 'serialize', 'peak KB'))
+    out.write(' %8s\n' % 'change' if baseline != None else '\n')
+
+    for result in results['results']:
+        phases = result['phases']
+        memory = result['peak_memory_kb']
+        header = phases['version'] + phases['publicid'] + phases['charset']
+        out.write('%-14s %-8s %8d %9.1f %7.2f %8.1fus %8.1fus %8.1fus %8.1fus %9s' % (
+            result['application'], result['profile'], result['bytes'],
+            result['docs_per_s'], result['mb_per_s'], header * 1e6,
+            phases['stringtable'] * 1e6, phases['body'] * 1e6,
+            phases['serialization'] * 1e6,
+            str(memory) if memory != None else '-'))
+
+        if baseline == None:
+            out.write('\n')
+            continue
+
+        old = previous.get((result['application'], result['profile']))
+        if old != None:
+            change = 100.0 * (result['docs_per_s'] / old['docs_per_s'] - 1.0)
+            out.write(' %+7.1f%%\n' % change)
+        else:
+            out.write(' %8s\n' % '-')
+
+
+def main():
+    r'''Function invoked when this module is ran as a script.
+    '''
+    import sys
+
+    (options, args) = getopt(sys.argv[1:], 'n:a:p:s:o:b:c')
+    applications = []
+    profiles = []
+    seed = 0
+    repeat = 20
+    output = None
+    baseline = None
+    compiled = False
+    for (option, value) in options:
+        if option == '-n':
+            repeat = int(value)
+        elif option == '-a':
+            applications.append(value)
+        elif option == '-p':
+            profiles.append(value)
+        elif option == '-s':
+            seed = int(value)
+        elif option == '-o':
+            output = value
+        elif option == '-b':
+            with open(value) as file:
+                baseline = load(file)
+        elif option == '-c':
+            compiled = True
+
+    results = benchmark(applications, profiles, seed, repeat, compiled)
+    report(results, baseline)
+    if output != None:
+        with open(output, 'w') as file:
+            dump(results, file, indent = 2, sort_keys = True)
+
+
+# Command-line entry point
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#coding=utf-8
+
+r'''WBXML specification for the SyncML 1.1 device information format.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+__version__ = '1.0.0'
+
+_devinf = { # Page 0
+    0x05: ('CTCap', None),
+    0x06: ('CTType', None),
+    0x07: ('DataStore', None),
+    0x08: ('DataType', None),
+    0x09: ('DevID', None),
+    0x0A: ('DevInf', None),
+    0x0B: ('DevTyp', None),
+    0x0C: ('DisplayName', None),
+    0x0D: ('DSMem', None),
+    0x0E: ('Ext', None),
+    0x0F: ('FwV', None),
+    0x10: ('HwV', None),
+    0x11: ('Man', None),
+    0x12: ('MaxGUIDSize', None),
+    0x13: ('MaxID', None),
+    0x14: ('MaxMem', None),
+    0x15: ('Mod', None),
+    0x16: ('OEM', None),
+    0x17: ('ParamName', None),
+    0x18: ('PropName', None),
+    0x19: ('Rx', None),
+    0x1A: ('Rx-Pref', None),
+    0x1B: ('SharedMem', None),
+    0x1C: ('Size', None),
+    0x1D: ('SourceRef', None),
+    0x1E: ('SwV', None),
+    0x1F: ('SyncCap', None),
+    0x20: ('SyncType', None),
+    0x21: ('Tx', None),
+    0x22: ('Tx-Pref', None),
+    0x23: ('ValEnum', None),
+    0x24: ('VerCT', None),
+    0x25: ('VerDTD', None),
+    0x26: ('XNam', None),
+    0x27: ('XVal', None),
+    0x28: ('UTC', None),
+    0x29: ('SupportNumberOfChanges', None),
+    0x2A: ('SupportLargeObjs', None)
+}
+
+encoding = {
+    # The XML application's DTD string.
+    'dtd': r'DevInf PUBLIC "-//SYNCML//DTD DevInf 1.1//EN" "http://www.syncml.org/docs/devinf_v11_20020215.dtd"',
+
+    # Token codes for the XML application's elements.
+    'elements': [
+        _devinf
+    ]
+}
@@ -0,0 +1,45 @@
+#coding=utf-8
+
+r'''WBXML specification for the SyncML 1.2 device information format.
+
+    DevInf 1.2 extends the tag table of DevInf 1.1 (see devinf11.py) with the
+    tags describing content type properties and filtering capabilities.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+__version__ = '1.0.0'
+
+import devinf11
+
+_devinf = dict(devinf11._devinf)
+_devinf.update({
+    0x2B: ('Property', None),
+    0x2C: ('PropParam', None),
+    0x2D: ('MaxOccur', None),
+    0x2E: ('NoTruncate', None),
+    0x30: ('Filter-Rx', None),
+    0x31: ('FilterCap', None),
+    0x32: ('FilterKeyword', None),
+    0x33: ('FieldLevel', None),
+    0x34: ('SupportHierarchicalSync', None)
+})
+
+encoding = {
+    # The XML application's DTD string.
+    'dtd': r'DevInf PUBLIC "-//SYNCML//DTD DevInf 1.2//EN" "http://www.openmobilealliance.org/tech/DTD/OMA-SyncML-Device_Information-DTD-1.2.dtd"',
+
+    # Token codes for the XML application's elements.
+    'elements': [
+        _devinf
+    ]
+}
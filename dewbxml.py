@@ -1,4 +1,4 @@
-#! /usr/bin/env python
+#! /usr/bin/env python3
 #coding=utf-8
 
 r'''Converter of Wireless Binary XML (WBXML) documents to plain-text XML.
@@ -10,6 +10,17 @@ r'''Converter of Wireless Binary XML (WBXML) documents to plain-text XML.
     Alternatively, the program can be invoked from command line with either two
     arguments (the input and output paths) or just one (in which case the output
     is written to standard output).
+
+    Finally, many files can be decoded at once across a pool of worker
+    processes by invoking the program as:
+
+        dewbxml.py --batch [-j <workers>] [-c <chunk size>] [-o <output dir>]
+                           [-p <public id>] <inputs>
+
+    Where inputs are WBXML files, directories, glob patterns or manifest files
+    (prefixed by '@') listing one input per line, and option -p (which can be
+    given multiple times) names applications to load before starting workers.
+    See parsebatch() for details.
 '''
 
 __license__ = r'''
@@ -25,13 +36,24 @@ DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
 
 __version__ = '1.0.0'
 
-import provisioning
-import rightsobjects
-import wml13
-
-from base64    import b64encode
-from sys       import stdout
-from traceback import print_exc
+from base64           import b64encode
+from binascii         import hexlify
+from codecs           import lookup
+from copy             import copy
+from glob             import glob
+from hashlib          import sha1
+from importlib        import import_module
+from importlib.util   import module_from_spec, spec_from_file_location
+from io               import FileIO, TextIOWrapper
+from os               import PathLike, environ, fspath, fstat, makedirs, remove, replace, walk
+from os.path          import abspath, commonpath, dirname, expanduser, isdir, isfile, join, normcase, relpath, splitext
+from re               import search
+from sys              import intern, stderr, stdout
+from tempfile         import mkstemp
+from threading        import RLock
+from timeit           import default_timer
+from types            import ModuleType
+from xml.sax.saxutils import escape, quoteattr
 
 # List of known charsets, indexed by their IANA numbers.
 _charsets = {
@@ -46,13 +68,39 @@ _charsets = {
     106: 'utf-8'
 }
 
-# List of known WBXML encondings for plain-text XML applications.
+# Charset assumed for WBXML 1.0 documents, which don't specify one.
+_defaultcharset = 106
+
+# Modules defining the WBXML encodings of known plain-text XML applications,
+# indexed by public identifier. Modules are only imported when the application
+# is first used (see wbxmlregistry). The FPIs of applications with numeric
+# public identifiers are registered as aliases of the latter, so documents
+# giving them as strings don't require loading every module to be matched.
 _applications = {
-    0x0B: provisioning.encoding,
-    0x0E: rightsobjects.encoding,
-    0x04: wml13.encoding
+    0x01: 'activesync',
+    0x0B: 'provisioning',
+    0x0E: 'rightsobjects',
+    0x04: 'wml13',
+    0x0FD3: 'syncml11',
+    0x0FD4: 'devinf11',
+    0x1201: 'syncml12',
+    0x1203: 'devinf12',
+
+    '-//MICROSOFT//DTD ActiveSync//EN': 0x01,
+    '-//WAPFORUM//DTD PROV 1.0//EN': 0x0B,
+    '-//OMA//DTD DRMREL 1.0//EN': 0x0E,
+    '-//WAPFORUM//DTD WML 1.3//EN': 0x04,
+    '-//SYNCML//DTD SyncML 1.1//EN': 0x0FD3,
+    '-//SYNCML//DTD DevInf 1.1//EN': 0x0FD4,
+    '-//SYNCML//DTD SyncML 1.2//EN': 0x1201,
+    '-//SYNCML//DTD DevInf 1.2//EN': 0x1203
 }
 
+# Maximum number of WBXML documents nested within one another (see
+# wbxmlopaque) that are decoded. Opaque data nested deeper is output encoded,
+# so decoding and writing out nested documents can't exhaust the stack.
+_maxnesting = 8
+
 # Special WBXML tokens.
 SWITCH_PAGE = 0x00
 END         = 0x01
@@ -60,6 +108,23 @@ STR_I       = 0x03
 STR_T       = 0x83
 OPAQUE      = 0xC3
 
+# Entry point group under which packages publish additional applications.
+_plugins = 'dewbxml.applications'
+
+# Table of a code page not defined by an application, where all tokens are
+# unknown.
+_unknownpage = (None,) * 256
+
+# Number of elements shown at each end of long element paths in error
+# messages.
+_pathends = 3
+
+# Kinds of attribute values, as resolved when compiling an application.
+_FIXED    = 0 # Pre-defined value string, no value token follows
+_STRING   = 1 # Inline or string table reference, or token number
+_TABLE    = 2 # Dictionary mapping value tokens to value strings
+_FUNCTION = 3 # Function decoding value tokens
+
 
 class wbxmldocument(object):
     r'''Class for WBXML DOM document objects.
@@ -70,23 +135,28 @@ class wbxmldocument(object):
         self.encoding = ''
         self.schema = ''
         self.version = ''
-        self.__stringtable = []
+        self.__stringtable = wbxmlstringtable()
         self.root = None
+        self.errors = []
 
     def __str__(self):
         r'''Converts this document object (and contained element objects,
             recursively) to string.
         '''
-        return \
-            r'<?xml version="1.0" encoding="' + self.encoding + r'"?>' + \
-            '\n\n' + \
-            r'<!DOCTYPE ' + self.schema + r'>' + \
-            '\n\n' + \
-            r'<!-- WBXML version: ' + self.version + r' -->' + \
-            '\n\n' + \
-            r'<!-- Contents of string table: "' + str(self.stringtable) + r'" -->' + \
-            '\n\n' + \
-            str(self.root)
+        chunks = _chunkwriter()
+        self.write(chunks)
+        return ''.join(chunks)
+
+    def write(self, out):
+        r'''Writes this document object (and contained element objects,
+            recursively) to a file-like object, one chunk at a time.
+        '''
+        out.write(r'<?xml version="1.0" encoding="' + self.encoding + r'"?>' + '\n\n')
+        out.write(r'<!DOCTYPE ' + self.schema + r'>' + '\n\n')
+        out.write(r'<!-- WBXML version: ' + self.version + r' -->' + '\n\n')
+        out.write(r'<!-- Contents of string table: "' + str(self.stringtable) + r'" -->' + '\n\n')
+        if self.root != None:
+            self.root.write(out, 0)
 
     def addchild(self, root):
         r'''Sets this document's root object. It's a convenience method meant
@@ -97,32 +167,118 @@ class wbxmldocument(object):
 
     @property
     def stringtable(self):
-        string = ''
-        table = []
-        for code in self.__stringtable:
-            if code != 0x00:
-                string += chr(code)
-            else:
-                table.append(string)
-                string = ''
-
-        return table
+        r'''List of strings in this document's string table.
+        '''
+        return self.__stringtable.strings
 
     @stringtable.setter
     def stringtable(self, table):
+        r'''Sets this document's string table, either from a wbxmlstringtable
+            object or from the table's raw contents.
+        '''
+        if not isinstance(table, wbxmlstringtable):
+            table = wbxmlstringtable(table)
+
         self.__stringtable = table
 
 
+class wbxmlstringtable(object):
+    r'''Class for WBXML string tables. The table is split into strings once,
+        when created; strings are then indexed by their offsets, so string
+        table references can be resolved with a single lookup.
+
+        Strings are decoded from the given charset (a Python codec name).
+        Bytes that aren't valid in the charset are decoded as surrogate
+        escapes, so they're written back unchanged when the text is encoded
+        to the same charset.
+    '''
+    def __init__(self, data = b'', codec = 'utf-8'):
+        r'''Creates a new string table object from the table's raw contents,
+            given as bytes or any other buffer.
+        '''
+        data = bytes(data)
+        offsets = {}
+        strings = []
+        start = 0
+        while start < len(data):
+            end = data.find(b'\0', start)
+            if end < 0:
+                end = len(data)
+            string = data[start:end].decode(codec, 'surrogateescape')
+            offsets[start] = string
+            strings.append(string)
+            start = end + 1
+
+        self.__data = data
+        self.__codec = codec
+        self.__offsets = offsets
+        self.strings = strings
+
+    def __len__(self):
+        r'''Returns the length of the string table, in bytes.
+        '''
+        return len(self.__data)
+
+    def __getitem__(self, offset):
+        r'''Returns the string starting at the given offset of the string
+            table. Offsets pointing to the middle of a string (i.e. to one of
+            its suffixes) are resolved by scanning the table from the offset.
+        '''
+        string = self.__offsets.get(offset)
+        if string != None:
+            return string
+
+        data = self.__data
+        if offset >= len(data):
+            raise IndexError('String table offset out of range: ' + str(offset))
+
+        end = data.find(b'\0', offset)
+        string = data[offset:end] if end >= 0 else data[offset:]
+        return string.decode(self.__codec, 'surrogateescape')
+
+
 class wbxmlelement(object):
     r'''Class for WBXML DOM elements.
+
+        Element objects have no per-instance dictionary, and their attributes
+        dictionary and children list are only allocated when first used, so
+        leaf elements and elements without attributes take little memory.
     '''
-    def __init__(self, name = None, attributes = {}):
+    __slots__ = ('parent', 'name', '__attributes', '__children')
+
+    def __init__(self, name = None, attributes = None):
         r'''Creates a new WBXML DOM element object.
         '''
         self.parent = None
         self.name = name
-        self.attributes = dict(attributes)
-        self.children = []
+        self.__attributes = dict(attributes) if attributes else None
+        self.__children = None
+
+    @property
+    def attributes(self):
+        r'''Dictionary of this element's attributes.
+        '''
+        if self.__attributes == None:
+            self.__attributes = {}
+
+        return self.__attributes
+
+    @attributes.setter
+    def attributes(self, attributes):
+        self.__attributes = attributes
+
+    @property
+    def children(self):
+        r'''List of this element's children.
+        '''
+        if self.__children == None:
+            self.__children = []
+
+        return self.__children
+
+    @children.setter
+    def children(self, children):
+        self.__children = children
 
     def __str__(self):
         r'''Converts this element object (and contained element objects,
@@ -134,40 +290,72 @@ class wbxmlelement(object):
         r'''Converts this element object (and contained element objects,
             recursively) to string, idented to the given ident level.
         '''
-        ident = level * '  '
-        attributes = ''
-        for (name, value) in self.attributes.items():
-            attributes += ' ' + name + '="' + value + '"'
-
-        closebracket = ''
-        children = ''
-        closetag = ''
-
-        if len(self.children) > 0:
-            closebracket = '>\n'
-            closetag = ident + '</' + self.name + '>'
-            for child in self.children:
-                children += child.tostring(level + 1)
-        else:
-            closebracket = ' />'
-
-        return ident + '<' + self.name + attributes + closebracket + children + closetag + '\n'
+        chunks = _chunkwriter()
+        self.write(chunks, level)
+        return ''.join(chunks)
+
+    def write(self, out, level = 0):
+        r'''Writes this element object (and contained element objects,
+            recursively) to a file-like object, idented to the given ident
+            level. Output is written one chunk at a time, so no intermediate
+            strings are built for subtrees.
+
+            The tree is walked with an explicit stack rather than by recursive
+            calls, so documents of any depth can be written.
+        '''
+        write = out.write
+        pending = [(self, level)]
+        while len(pending) > 0:
+            (node, level) = pending.pop()
+            if isinstance(node, str):
+                write(node)
+                continue
+            elif not isinstance(node, wbxmlelement):
+                node.write(out, level)
+                continue
+
+            ident = level * '  '
+            write(ident + '<' + node.name)
+            if node.__attributes:
+                for (name, value) in node.__attributes.items():
+                    write(' ' + name + '=' + quoteattr(value))
+
+            children = node.__children
+            if children:
+                write('>\n')
+                pending.append((ident + '</' + node.name + '>\n', level))
+                for i in range(len(children) - 1, -1, -1):
+                    pending.append((children[i], level + 1))
+            else:
+                write(' />\n')
 
     def addchild(self, child):
         r'''Adds a child element to this element object.
         '''
-        self.children.append(child)
+        if self.__children == None:
+            self.__children = [child]
+        else:
+            self.__children.append(child)
         child.parent = self
 
 
 class wbxmlstring(object):
     r'''Class for text elements.
     '''
+    __slots__ = ('parent', '__value')
+
     def __init__(self, value):
         r'''Creates a new text element object from a string.
         '''
+        self.parent = None
         self.__value = value
 
+    @property
+    def value(self):
+        r'''Text contents of this element.
+        '''
+        return self.__value
+
     def __str__(self):
         r'''Converts this text element to string.
         '''
@@ -177,232 +365,1891 @@ class wbxmlstring(object):
         r'''Converts this text element to string, idented to the given ident
             level.
         '''
-        return level * '  ' + self.__value + '\n'
+        return level * '  ' + escape(self.__value) + '\n'
+
+    def write(self, out, level = 0):
+        r'''Writes this text element to a file-like object, idented to the
+            given ident level.
+        '''
+        out.write(level * '  ' + escape(self.__value) + '\n')
+
+
+class wbxmlopaque(object):
+    r'''Class for opaque data elements.
+
+        Opaque data is kept as a view into the buffer it was read from (when
+        possible), and only encoded to text when it's written out or its
+        value is accessed. Encoding is set by the format attribute, which can
+        be one of 'base64', 'hex' or 'raw' (data is output as is, with bytes
+        outside the ASCII range kept as surrogate escapes).
+
+        Opaque data may hold a whole WBXML document, as SyncML packages do
+        with device information. If the element has a parser, such documents
+        are decoded by it the first time the element's document is accessed
+        (which includes writing it out), and are output as XML instead of
+        encoded text. Parsers are only set on opaque data of applications that
+        enable nested decoding, up to _maxnesting documents deep.
+    '''
+    __slots__ = ('parent', 'format', 'parser', '__data', '__document')
+
+    def __init__(self, data, format = 'base64', parser = None):
+        r'''Creates a new opaque data element object from a buffer (e.g. a
+            string or memoryview), to be encoded in the given format. Nested
+            WBXML documents are decoded with the given parser, if any.
+        '''
+        self.parent = None
+        self.format = format
+        self.parser = parser
+        self.__data = data
+        self.__document = False
+
+    @property
+    def data(self):
+        r'''Opaque data contents of this element, as bytes.
+        '''
+        return bytes(self.__data)
+
+    @property
+    def value(self):
+        r'''Opaque data contents of this element, encoded to text in the
+            element's format.
+        '''
+        return _opaqueformats[self.format](self.data)
+
+    @property
+    def document(self):
+        r'''WBXML DOM document nested in this element's data, or None if the
+            data isn't a WBXML document of an application known to the
+            element's parser (or the element has no parser). The document is
+            decoded on first access.
+        '''
+        if self.__document == False:
+            self.__document = self.parser.parsenested(self.__data) if self.parser != None else None
+
+        return self.__document
+
+    def __str__(self):
+        r'''Converts this opaque data element to string.
+        '''
+        return self.tostring(0)
+
+    def tostring(self, level):
+        r'''Converts this opaque data element to string, idented to the given
+            ident level.
+        '''
+        chunks = _chunkwriter()
+        self.write(chunks, level)
+        return ''.join(chunks)
+
+    def write(self, out, level = 0):
+        r'''Writes this opaque data element to a file-like object, idented to
+            the given ident level. A nested WBXML document is written as its
+            root element.
+        '''
+        document = self.document
+        if document != None and document.root != None:
+            document.root.write(out, level)
+        else:
+            out.write(level * '  ' + escape(self.value) + '\n')
+
+
+# Functions encoding opaque data to text, indexed by format name.
+_opaqueformats = {
+    'base64': lambda data: b64encode(data).decode('ascii'),
+    'hex': lambda data: hexlify(data).decode('ascii'),
+    'raw': lambda data: data.decode('ascii', 'surrogateescape')
+}
+
+
+class _chunkwriter(list):
+    r'''File-like object that collects written chunks into a list, so they
+        can be joined into a single string at the end.
+    '''
+    write = list.append
+
+
+def _readfile(path):
+    r'''Reads the contents of the file at the given path into a bytearray,
+        using a single bulk read of the file's size. Files whose size isn't
+        known in advance (e.g. pipes, which report a size of 0) and reads that
+        come up short are completed by reading up to the end of the file.
+    '''
+    with FileIO(path, 'rb') as file:
+        data = bytearray(fstat(file.fileno()).st_size)
+        length = file.readinto(data) if len(data) > 0 else 0
+        del data[length:]
+        data += file.readall()
+
+    return data
+
+
+def _readbuffer(data):
+    r'''Returns the contents of an in-memory buffer as a bytes or bytearray
+        object. Objects of either type are returned as is, without copying,
+        as are those underlying a memoryview of their whole contents; other
+        buffers (e.g. a memoryview of part of an object) are copied into a
+        bytes object.
+    '''
+    if isinstance(data, (bytes, bytearray)):
+        return data
+
+    if isinstance(data, memoryview) and isinstance(data.obj, (bytes, bytearray)):
+        if data.contiguous and data.itemsize == 1 and data.nbytes == len(data.obj):
+            return data.obj
+
+    return bytes(data)
+
+
+def _writexml(doc, plain = None):
+    r'''Writes a WBXML DOM document object as plain-text XML, encoded in the
+        document's charset, to the file at the given path, or to the standard
+        output if no path is given.
+    '''
+    encoding = doc.encoding or _charsets[_defaultcharset]
+    if plain != None:
+        with open(plain, 'w', encoding = encoding, errors = 'surrogateescape') as out:
+            doc.write(out)
+        return
+
+    buffer = getattr(stdout, 'buffer', None)
+    if buffer == None:
+        doc.write(stdout)
+        return
+
+    out = TextIOWrapper(buffer, encoding, 'surrogateescape')
+    doc.write(out)
+    out.flush()
+    out.detach()
 
 
 class wbxmlreader(object):
-    r'''File reader for WBXML documents. Implements several conveniences for
-        parsing WBXML files.
+    r'''Buffered reader for WBXML documents. Implements several conveniences
+        for parsing WBXML files.
+
+        The whole document is loaded into memory with a single bulk read, and
+        tokens are then read by advancing an integer cursor over the buffer.
+        Indexing a bytes or bytearray buffer yields integers, so tokens are
+        read without any conversion.
     '''
-    def __init__(self, path):
-        r'''Creates a new WBXML reader for the file at the given path.
+    def __init__(self, data):
+        r'''Creates a new WBXML reader.
+
+            If data is a string or path object (e.g. a pathlib.Path), it is
+            interpreted as a path to a WBXML file; if it has a read() method,
+            it's taken to be a file-like object, and its contents are read in
+            one go. Otherwise, it's expected to be an in-memory buffer (bytes,
+            a bytearray, memoryview or any other object supporting the buffer
+            protocol); bytes and bytearrays, and memoryviews of their whole
+            contents, are read in place, without copying.
         '''
-        self.__bytes = open(path, 'rb')
+        if isinstance(data, (str, PathLike)):
+            data = _readfile(fspath(data))
+        elif hasattr(data, 'read'):
+            data = _readbuffer(data.read())
+        else:
+            data = _readbuffer(data)
+
+        self.__bytes = data
+        self.__length = len(data)
+        self.__offset = 0
+        self.__growing = False
 
     def __iter__(self):
         r'''Returns an iterator over this reader (actually, the object itself).
         '''
         return self
 
-    def next(self):
+    def __next__(self):
         r'''Reads one binary token from the WBXML file and advances the file
             pointer one position. If the end-of-file has already been reached,
             raises the StopIteration exception.
         '''
         return self.read()
 
+    @property
+    def offset(self):
+        r'''Position of the file pointer, in bytes from the start of the
+            buffer.
+        '''
+        return self.__offset
+
+    def seek(self, offset):
+        r'''Moves the file pointer to the given position.
+        '''
+        self.__offset = offset
+
+    def extend(self, data):
+        r'''Appends data to the end of the buffer, which must be a bytearray.
+        '''
+        self.__bytes.extend(data)
+        self.__length = len(self.__bytes)
+        self.__growing = True
+
+    def discard(self):
+        r'''Discards all data before the file pointer, which is moved back to
+            the start of the buffer.
+        '''
+        del self.__bytes[:self.__offset]
+        self.__length = len(self.__bytes)
+        self.__offset = 0
+
+    def peek(self):
+        r'''Returns the next token from the underlying WBXML file as an
+            integer, without incrementing the file pointer.
+
+            If the end-of-file was reached, this method raises the
+            StopIteration exception.
+        '''
+        offset = self.__offset
+        if offset >= self.__length:
+            raise StopIteration()
+
+        return self.__bytes[offset]
+
     def read(self, length = None):
         r'''Reads a sequence of one or more tokens from the underlying WBXML
             file, incrementing the file pointer accordingly.
 
             If the length is ommited, one token is read and returned as an
-            integer; otherwise, at most (length) tokens are read and returned as
-            a character string. This holds true even for length = 1, so
-            reader.read(1) returns a single-character string.
+            integer; otherwise, (length) tokens are read and returned as bytes.
+            This holds true even for length = 1, so reader.read(1) returns a
+            single-byte bytes object.
 
-            If a previous operation reached the end-of-file, this method raises
-            the StopIteration exception.
+            If fewer than the requested tokens are left before the end-of-file,
+            this method raises the StopIteration exception.
         '''
-        data = self.__bytes.read(1 if length == None else length)
+        offset = self.__offset
+        if offset >= self.__length:
+            raise StopIteration()
 
-        if len(data) == 0:
+        if length == None:
+            self.__offset = offset + 1
+            return self.__bytes[offset]
+
+        end = offset + length
+        if end > self.__length:
             raise StopIteration()
 
-        return ord(data) if length == None else data
+        self.__offset = end
+        return bytes(self.__bytes[offset:end])
 
-    def readopaque(self):
+    def readview(self):
         r'''Reads an opaque data buffer from the WBXML file, and returns it
-            as a base64 string. The file pointer is incremented until past the
-            end of the buffer.
+            as a memoryview into the reader's buffer, without copying. The file
+            pointer is incremented until past the end of the buffer.
+
+            If data was appended to the reader with extend(), the buffer may
+            still be resized, so a copy of the data is returned instead.
+        '''
+        length = self.readint()
+        offset = self.__offset
+        end = offset + length
+        if end > self.__length:
+            raise StopIteration()
+
+        self.__offset = end
+        if self.__growing:
+            return bytes(self.__bytes[offset:end])
+
+        return memoryview(self.__bytes)[offset:end]
+
+    def readint(self):
+        r'''Reads a multi-byte unsigned integer (mb_u_int32) from the WBXML
+            file, and returns it as an integer. The file pointer is incremented
+            until past the last byte of the integer.
         '''
-        length = self.read()
-        data = self.read(length)
-        return b64encode(data)
+        token = self.read()
+        if token < 0x80:
+            return token
+
+        value = token & 0x7F
+        for i in range(4):
+            token = self.read()
+            value = (value << 7) | (token & 0x7F)
+            if token < 0x80:
+                return value
+
+        raise ValueError('Multi-byte integer longer than 5 bytes at offset ' + str(self.__offset))
 
-    def readstring(self):
+    def readstring(self, codec = None):
         r'''Reads tokens from the WBXML file until the end-of-string character
-            (0x00) is reached, returning the result as a string. The file
-            pointer is incremented until past the end-of-string character.
+            (0x00) is reached, returning the result as bytes or, if a codec
+            name is given, as a string decoded with it (bytes not valid in the
+            codec are decoded as surrogate escapes). The file pointer is
+            incremented until past the end-of-string character.
         '''
-        data = ''
-        while True:
-            char = self.read(1)
-            if char == '\0':
-                return data
-            data += char
+        offset = self.__offset
+        end = self.__bytes.find(b'\0', offset)
+        if end < 0:
+            self.__offset = self.__length
+            raise StopIteration()
+
+        self.__offset = end + 1
+        if codec != None:
+            return self.__bytes[offset:end].decode(codec, 'surrogateescape')
+
+        return bytes(self.__bytes[offset:end])
+
+
+class wbxmlapplication(object):
+    r'''WBXML token specification of an application, compiled into flat
+        lookup tables.
+
+        For each code page, the elements table maps every element token (tag
+        code plus "has attributes" and "has contents" bits) to a tuple
+        (tag, name, hasattributes, hascontents). The attributes table maps the
+        tag code of each element to a table mapping attribute tokens to tuples
+        (name, kind, value), where kind tells how the value is decoded. Tokens
+        not defined in the specification map to None.
+
+        The values table maps attribute value tokens valid for all attributes
+        (e.g. WML's "http://www.") to the corresponding strings, or to None if
+        the application doesn't define such a token.
+
+        The encoding attribute is the specification the tables were compiled
+        from. If nested is True, opaque data in the application's documents
+        may hold WBXML documents, which are decoded (see wbxmlopaque). If the
+        application was compiled by a wbxmlcompiler object, decoder is the
+        specialized function used to decode document bodies; otherwise it's
+        None.
+    '''
+    def __init__(self, encoding):
+        r'''Compiles an application specification, given in the format
+            described in the README file.
+        '''
+        self.dtd = encoding['dtd']
+        self.encoding = encoding
+        self.nested = encoding.get('nested', False)
+        self.decoder = None
+        self.values = [None] * 256
+        for (token, value) in encoding.get('values', {}).items():
+            self.values[token] = value
+
+        self.elements = []
+        self.attributes = []
+        for page in encoding['elements']:
+            elements = [None] * 256
+            attributes = [None] * 64
+            for (tag, (name, specs)) in page.items():
+                for bits in (0x00, 0x40, 0x80, 0xC0):
+                    elements[tag | bits] = (tag, name, (bits & 0x80) != 0, (bits & 0x40) != 0)
+
+                if specs == None:
+                    continue
+
+                values = attributes[tag] = [None] * 256
+                for (token, (attribute, value)) in specs.items():
+                    if value == None:
+                        kind = _STRING
+                    elif isinstance(value, dict):
+                        kind = _TABLE
+                    elif callable(value):
+                        kind = _FUNCTION
+                    else:
+                        kind = _FIXED
+                    values[token] = (attribute, kind, value)
+
+            self.elements.append(elements)
+            self.attributes.append(attributes)
+
+    def page(self, page):
+        r'''Returns the elements table of the given code page, or a table where
+            all tokens are unknown if the application doesn't define the page.
+        '''
+        return self.elements[page] if page < len(self.elements) else _unknownpage
+
+
+class wbxmlerror(ValueError):
+    r'''Exception raised for malformed or unsupported WBXML documents.
+
+        Besides the error message, it carries the position where the error
+        was found: the byte offset into the document, the token being decoded
+        (None if the error doesn't concern a single token), the active code
+        page and the path of open elements, as a list of element names
+        starting from the root. Only the first and last few elements of long
+        paths are included in the error message.
+    '''
+    def __init__(self, message, offset = None, token = None, page = None, path = ()):
+        r'''Creates a new WBXML error object.
+        '''
+        ValueError.__init__(self, message)
+        self.offset = offset
+        self.token = token
+        self.page = page
+        self.path = list(path)
+
+    def __str__(self):
+        r'''Returns the error message followed by the error's position.
+        '''
+        position = []
+        if self.offset != None:
+            position.append('offset ' + str(self.offset))
+        if self.token != None:
+            position.append('token 0x%02X' % self.token)
+        if self.page != None:
+            position.append('page ' + str(self.page))
+        path = self.path
+        if len(path) > 2 * _pathends:
+            path = path[:_pathends] + ['...'] + path[-_pathends:]
+        if len(path) > 0:
+            position.append('element /' + '/'.join(path))
+
+        message = self.args[0]
+        return message + ' (' + ', '.join(position) + ')' if len(position) > 0 else message
+
+
+class wbxmlcontext(object):
+    r'''Decoding state of a single WBXML document. Keeping it apart from
+        the parser object allows a single parser to decode any number of
+        documents at the same time (e.g. from several threads).
+
+        As specified by WBXML, the code pages of tags and attributes are
+        switched independently: page is the tag code page, and attributepage
+        the attribute code page. The elements table of the tag code page is
+        kept in tags, so switching pages only swaps that table. Opaque data
+        holding WBXML documents is decoded by the nested parser, or not at
+        all if it's None.
+    '''
+    def __init__(self, data, doc):
+        r'''Creates a new decoding context for the document read by the given
+            wbxmlreader object into the given WBXML DOM document object.
+        '''
+        self.data = data
+        self.doc = doc
+        self.application = None
+        self.page = 0
+        self.attributepage = 0
+        self.tags = _unknownpage
+        self.strings = wbxmlstringtable()
+        self.stack = []
+        self.stats = None
+        self.strict = True
+        self.codec = 'utf-8'
+        self.nested = None
+
+
+class wbxmlstats(object):
+    r'''Decoding statistics, collected by wbxmlparser.parse() when passed a
+        stats object. A single object can be passed to any number of calls,
+        in which case statistics are accumulated over all documents.
+
+        The phases dictionary maps the names of parsing phases ('version',
+        'publicid', 'charset', 'stringtable' and 'body') to the time spent on
+        them in seconds. The tokens dictionary counts the tokens decoded by
+        type: 'elements', 'attributes' (attribute tokens), 'values'
+        (attribute value tokens), 'STR_I', 'STR_T', 'OPAQUE' and
+        'SWITCH_PAGE'. The hits dictionary maps string table offsets to the
+        number of references to them.
+    '''
+    def __init__(self):
+        r'''Creates a new statistics object with all counts set to zero.
+        '''
+        self.documents = 0
+        self.bytes = 0
+        self.phases = dict.fromkeys(('version', 'publicid', 'charset', 'stringtable', 'body'), 0.0)
+        self.tokens = dict.fromkeys(('elements', 'attributes', 'values', 'STR_I', 'STR_T', 'OPAQUE', 'SWITCH_PAGE'), 0)
+        self.hits = {}
+        self.__last = None
+
+    def start(self):
+        r'''Starts timing the first phase of a document.
+        '''
+        self.__last = default_timer()
+
+    def lap(self, phase):
+        r'''Adds the time elapsed since the previous call (or the call to
+            start()) to the given phase.
+        '''
+        now = default_timer()
+        self.phases[phase] += now - self.__last
+        self.__last = now
+
+    def hit(self, offset):
+        r'''Counts a reference to the given string table offset.
+        '''
+        self.hits[offset] = self.hits.get(offset, 0) + 1
+
+
+class wbxmlcompiler(object):
+    r'''Generator of decoders specialized for a single application.
+
+        The generic decoding loop looks up every token in the tables of a
+        wbxmlapplication object, and decodes each attribute through several
+        method calls. A compiled decoder is the source of a Python module with
+        the tables of one application written out as literals, attribute
+        prefixes resolved in advance, and element and attribute decoding
+        inlined into a single loop, leaving out the kinds of attribute values
+        the application doesn't use.
+
+        Generated modules are kept in a cache directory, named after a hash
+        of the specification they were generated from (and of the code
+        generating them), so a specification is only compiled again when
+        either changes. Functions in the specification (e.g. attribute value
+        decoders) can't be written out, so they are referenced from the
+        specification object itself when the module is loaded.
+    '''
+    def __init__(self, cache = None):
+        r'''Creates a new compiler object. Generated modules are kept in the
+            given directory, or in the one named by the DEWBXML_CACHE
+            environment variable, or else in ~/.cache/dewbxml.
+        '''
+        if cache == None:
+            cache = environ.get('DEWBXML_CACHE') or join(expanduser('~'), '.cache', 'dewbxml')
+
+        self.cache = cache
+
+    def compile(self, encoding):
+        r'''Returns the compiled decoder for the given application
+            specification, loading it from the cache directory, or generating
+            it first if it's not there. If the module can't be written to the
+            cache, it's loaded straight from the generated source.
+
+            Decoders are only loaded once per process, and shared by all
+            compiler objects.
+        '''
+        digest = _spechash(encoding)
+        loaded = _decoders.get(digest)
+        if loaded != None and loaded[0] is encoding:
+            return loaded[1]
+
+        name = '_dewbxml_' + digest
+        path = join(self.cache, name + '.py')
+        source = None
+        if not isfile(path):
+            source = self.generate(encoding, digest)
+            try:
+                if not isdir(self.cache):
+                    makedirs(self.cache)
+
+                # Write to a temporary file of its own first, so concurrent
+                # threads and processes never load (or write to) a partially
+                # written module.
+                (handle, temporary) = mkstemp('.tmp', name + '.', self.cache)
+                try:
+                    with open(handle, 'w', encoding = 'utf-8') as file:
+                        file.write(source)
+                    replace(temporary, path)
+                except OSError:
+                    remove(temporary)
+                    raise
+                source = None
+            except OSError:
+                path = None
+
+        decoder = self.__load(name, path, source, encoding)
+        _decoders[digest] = (encoding, decoder)
+        return decoder
+
+    def generate(self, encoding, digest = ''):
+        r'''Returns the source of the compiled decoder module for the given
+            application specification.
+        '''
+        application = wbxmlapplication(encoding)
+        kinds = set()
+        tables = []
+        lines = [
+            '# Decoder generated by DeWBXML for the application:',
+            '# ' + application.dtd,
+            '#',
+            '# Specification hash: ' + digest,
+            '# Do not edit, it will be generated again if the specification changes.',
+            '',
+            '',
+            'def _table(entries):',
+            '    table = [None] * 256',
+            '    for (token, entry) in entries.items():',
+            '        table[token] = entry',
+            '    return table',
+            '',
+            '',
+            '_unknown = [None] * 256',
+            ''
+        ]
+
+        # Attribute tables map attribute tokens to tuples (name, prefix, kind,
+        # table), where table is the value table or function of the attribute.
+        for (page, tags) in enumerate(application.attributes):
+            for (tag, specs) in enumerate(tags):
+                if specs == None:
+                    continue
+
+                lines.append('_attributes_%d_%02X = _table({' % (page, tag))
+                for (token, spec) in enumerate(specs):
+                    if spec == None or token in (SWITCH_PAGE, END):
+                        continue
+
+                    (name, kind, value) = spec
+                    kinds.add(kind)
+                    if kind == _FIXED:
+                        entry = (repr(name), repr(value), str(_STRING), 'None')
+                    elif kind == _STRING:
+                        entry = (repr(name), "''", str(_STRING), 'None')
+                    elif kind == _TABLE and _literal(value):
+                        entry = (repr(name), "''", str(_TABLE), repr(value))
+                    else:
+                        reference = "_encoding['elements'][%d][0x%02X][1][0x%02X][1]" % (page, tag, token)
+                        entry = (repr(name), "''", str(kind), reference)
+
+                    lines.append('    0x%02X: (%s),' % (token, ', '.join(entry)))
+
+                lines.append('})')
+                lines.append('')
+
+        # Attribute code pages map tag codes to attribute tables.
+        lines.append('_attributes = [')
+        for (page, tags) in enumerate(application.attributes):
+            tables = ['0x%02X: _attributes_%d_%02X' % (tag, page, tag) for (tag, specs) in enumerate(tags) if specs != None]
+            lines.append('    _table({' + ', '.join(tables) + '}),')
+
+        lines.append(']')
+        lines.append('')
+
+        # Element tables map element tokens to tuples (tag, name,
+        # hasattributes, hascontents).
+        lines.append('_elements = [')
+        for (page, elements) in enumerate(application.elements):
+            lines.append('    _table({')
+            for (token, element) in enumerate(elements):
+                if element != None:
+                    lines.append('        0x%02X: (0x%02X, %r, %r, %r),' % ((token,) + element))
+
+            lines.append('    }),')
+
+        lines.append(']')
+        lines.append('')
+
+        values = any(value != None for value in application.values)
+        if values:
+            lines.append('_values = %r' % (application.values,))
+            lines.append('')
+
+        parts = [0, 3 if values else 4, 5]
+        if _FUNCTION in kinds:
+            parts.insert(1, 2)
+        if _TABLE in kinds:
+            parts.insert(1, 1)
+
+        lines.append('')
+        for part in parts:
+            lines.extend(_decodertemplate[part].strip('\n').split('\n'))
+
+        return '\n'.join(lines) + '\n'
+
+    def __load(self, name, path, source, encoding):
+        r'''Loads a compiled decoder module, from the given path or else from
+            the given source, and returns its decoding function.
+        '''
+        if path != None:
+            spec = spec_from_file_location(name, path)
+            module = module_from_spec(spec)
+        else:
+            module = ModuleType(name)
+
+        # The DOM classes are passed in rather than imported, so decoded
+        # documents are made of the same classes as the loading module's,
+        # even if it's running as a script.
+        module._encoding = encoding
+        module.wbxmlelement = wbxmlelement
+        module.wbxmlstring = wbxmlstring
+        module.wbxmlopaque = wbxmlopaque
+        if path != None:
+            spec.loader.exec_module(module)
+        else:
+            exec(compile(source, '<' + name + '>', 'exec'), module.__dict__)
+
+        return module.body
+
+
+# Compiled decoders loaded by this process, as pairs (specification, decoder)
+# indexed by specification hash.
+_decoders = {}
+
+# Body of the decoding function of compiled decoders, split in parts so
+# branches for kinds of attribute values not used by an application can be
+# left out.
+_decodertemplate = (r'''
+def body(context, element, attributes, string, checkdepth, maxdepth, opaque, nested):
+    data = context.data
+    read = data.read
+    readint = data.readint
+    codec = context.codec
+    strings = context.strings
+    parent = context.doc
+    stack = context.stack
+    page = context.page
+    tags = _elements[page] if page < len(_elements) else _unknown
+    attributepage = context.attributepage
+    tables = _attributes[attributepage] if attributepage < len(_attributes) else _unknown
+    while True:
+        token = read()
+        if token == 0x01:
+            if len(stack) == 0:
+                return
+            stack.pop()
+            if len(stack) == 0:
+                return
+            parent = stack[-1]
+            continue
+        elif token == 0x00:
+            page = context.page = read()
+            tags = context.tags = _elements[page] if page < len(_elements) else _unknown
+            continue
+        elif token == 0x03:
+            parent.addchild(wbxmlstring(string(data, codec)))
+            continue
+        elif token == 0x83:
+            parent.addchild(wbxmlstring(strings[readint()]))
+            continue
+        elif token == 0xC3:
+            parent.addchild(wbxmlopaque(data.readview(), opaque, nested))
+            continue
+
+        entry = tags[token]
+        if entry == None:
+            (node, hascontents) = element(context, token)
+            attributepage = context.attributepage
+            tables = _attributes[attributepage] if attributepage < len(_attributes) else _unknown
+        else:
+            (tag, name, hasattributes, hascontents) = entry
+            node = wbxmlelement(name)
+            if hasattributes:
+                specs = tables[tag] or _unknown
+                nodeattributes = node.attributes
+                token = read()
+                while token != 0x01:
+                    start = data.offset - 1
+                    spec = specs[token]
+                    if spec != None:
+                        (attribute, value, kind, table) = spec
+                        try:
+                            token = read()
+                            while token >= 0x80 or token == 0x03:
+                                if token == 0x03:
+                                    value += string(data, codec)
+                                elif token == 0x83:
+                                    value += strings[readint()]''', r'''
+                                elif kind == 2:
+                                    value += table[token]''', r'''
+                                elif kind == 3:
+                                    value += table(node, token)''', r'''
+                                elif _values[token] != None:
+                                    value += _values[token]
+                                else:
+                                    value += str(token)''', r'''
+                                else:
+                                    value += str(token)''', r'''
+                                token = read()
+
+                            nodeattributes[attribute] = value
+                            continue
+                        except (KeyError, IndexError):
+                            pass
+
+                    # Attributes not in the tables (including page switches)
+                    # and value decoding errors are handled by the generic
+                    # decoder, from the start of the attribute on.
+                    data.seek(start)
+                    attributepage = context.attributepage = attributes(context, tag, node, attributepage)
+                    tables = _attributes[attributepage] if attributepage < len(_attributes) else _unknown
+                    break
+
+        parent.addchild(node)
+        if hascontents:
+            if len(stack) >= maxdepth:
+                checkdepth(context, len(stack) + 1)
+            stack.append(node)
+            parent = node
+        elif len(stack) == 0:
+            return
+''')
+
+
+def _literal(table):
+    r'''Returns whether a table of attribute values can be written out as a
+        literal in the source of a compiled decoder.
+    '''
+    return all(isinstance(token, int) and isinstance(value, str) for (token, value) in table.items())
+
+
+def _spechash(value, digest = None):
+    r'''Returns a hash of an application specification, as a string of hex
+        digits. Functions are hashed by name and bytecode, so changes to them
+        are detected as well.
+
+        The code generating compiled decoders is hashed along with the
+        specification, so decoders are generated again when it changes.
+    '''
+    if digest == None:
+        digest = sha1()
+        _spechash((_decodertemplate, wbxmlcompiler.generate, _literal), digest)
+        _spechash(value, digest)
+        return digest.hexdigest()
+
+    if isinstance(value, dict):
+        digest.update(b'{')
+        for key in sorted(value, key = repr):
+            _spechash(key, digest)
+            digest.update(b':')
+            _spechash(value[key], digest)
+        digest.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'[')
+        for item in value:
+            _spechash(item, digest)
+            digest.update(b',')
+        digest.update(b']')
+    elif callable(value):
+        code = getattr(value, '__code__', None)
+        name = getattr(value, '__module__', '') + '.' + getattr(value, '__qualname__', repr(type(value)))
+        digest.update(name.encode('utf-8'))
+        if code != None:
+            _codehash(code, digest)
+    else:
+        digest.update(repr(value).encode('utf-8', 'surrogateescape'))
+
+
+def _codehash(code, digest):
+    r'''Adds the bytecode, constants and names of a code object to a hash.
+        Nested code objects (e.g. of generator expressions) are hashed the
+        same way, since their representation includes their address.
+    '''
+    digest.update(code.co_code)
+    for constant in code.co_consts:
+        if hasattr(constant, 'co_code'):
+            _codehash(constant, digest)
+        else:
+            digest.update(repr(constant).encode('utf-8', 'surrogateescape'))
+
+    digest.update(repr(code.co_names).encode('utf-8', 'surrogateescape'))
+
+
+class wbxmlregistry(object):
+    r'''Registry of known applications, mapping public identifiers to their
+        WBXML token specifications.
+
+        Applications are registered under numeric public identifiers, or
+        formal public identifier (FPI) strings such as '-//WAPFORUM//DTD WML
+        1.3//EN'. An FPI may also be registered as an alias of a numeric
+        public identifier. As a last resort, a string not registered as
+        either is matched against the FPIs in the DTD strings of registered
+        applications (loading them all), so documents giving their public
+        identifier as a string table reference are recognized even if the
+        application is only registered under a numeric one.
+
+        Applications may be registered by module name, in which case the
+        module is only imported when the application is first used; its
+        specification is the module's encoding attribute. Specifications are
+        compiled into wbxmlapplication objects on first use as well, and the
+        compiled tables are shared by all parsers. Processes that only ever
+        decode one application thus don't pay for loading the others.
+
+        If an entry point group is given, applications published by installed
+        packages under it are registered the first time a public identifier
+        isn't found (see the README file). Public identifiers are resolved
+        once, and the result cached, so later lookups of the same identifier
+        take a single dictionary access. Plugin discovery and FPI indexing
+        are done under a lock, so threads looking up identifiers meanwhile
+        wait for them to finish instead of missing applications.
+    '''
+    def __init__(self, applications = {}, group = None):
+        r'''Creates a new registry of the given applications, a dictionary
+            mapping public identifiers to module names, specifications or
+            (for aliases) numeric public identifiers, and of the plugins in
+            the given entry point group, if any.
+        '''
+        self.__applications = {}
+        self.__aliases = {}
+        self.__compiled = {}
+        self.__group = group
+        self.__indexed = False
+        self.__lock = RLock()
+        for (publicid, application) in applications.items():
+            self.register(publicid, application)
+
+    def __contains__(self, publicid):
+        r'''Returns whether an application is known under the given public
+            identifier.
+        '''
+        try:
+            self.resolve(publicid)
+        except KeyError:
+            return False
+
+        return True
+
+    def __iter__(self):
+        r'''Returns an iterator over the public identifiers of registered
+            applications, including plugins.
+        '''
+        self.__discover()
+        return iter(list(self.__applications))
+
+    def register(self, publicid, application):
+        r'''Registers an application, given either as the name of the module
+            defining it or as a specification, under a public identifier. If
+            the application is given as a numeric public identifier instead,
+            the identifier is registered as an alias of it.
+        '''
+        self.__compiled = {}
+        if isinstance(application, int):
+            self.__aliases[publicid] = application
+            return
+
+        self.__applications[publicid] = application
+        self.__indexed = False
+        if isinstance(application, dict):
+            self.__alias(publicid, application)
+
+    def resolve(self, publicid):
+        r'''Returns the public identifier the application known under the
+            given one is registered under: the same identifier, or for FPI
+            strings, the identifier of the application with that FPI. Raises
+            KeyError if no application is known under it.
+        '''
+        if publicid in self.__applications:
+            return publicid
+
+        if publicid in self.__aliases:
+            return self.__aliases[publicid]
+
+        self.__discover()
+        if publicid in self.__applications:
+            return publicid
+
+        if isinstance(publicid, str):
+            self.__index()
+            if publicid in self.__aliases:
+                return self.__aliases[publicid]
+
+        raise KeyError(publicid)
+
+    def encoding(self, publicid):
+        r'''Returns the specification of the application known under the
+            given public identifier, importing its module if needed. Raises
+            KeyError if no application is known under it.
+        '''
+        publicid = self.resolve(publicid)
+        encoding = self.__applications[publicid]
+        if isinstance(encoding, dict):
+            return encoding
+
+        if isinstance(encoding, str):
+            encoding = import_module(encoding).encoding
+        else:
+            # Plugin entry points refer to a module or a specification.
+            encoding = encoding.load()
+            encoding = getattr(encoding, 'encoding', encoding)
+
+        self.__applications[publicid] = encoding
+        self.__alias(publicid, encoding)
+        return encoding
+
+    def application(self, publicid):
+        r'''Returns the compiled tables of the application known under the
+            given public identifier, as a wbxmlapplication object.
+        '''
+        application = self.__compiled.get(publicid)
+        if application == None:
+            resolved = self.resolve(publicid)
+            application = self.__compiled.get(resolved)
+            if application == None:
+                application = wbxmlapplication(self.encoding(resolved))
+                self.__compiled[resolved] = application
+
+            self.__compiled[publicid] = application
+
+        return application
+
+    def preload(self, publicids = None, compiler = None):
+        r'''Loads and compiles the applications known under the given public
+            identifiers (all registered ones by default) ahead of first use.
+            If a wbxmlcompiler object is given, their compiled decoders are
+            loaded as well.
+        '''
+        for publicid in (publicids if publicids != None else self):
+            application = self.application(publicid)
+            if compiler != None:
+                compiler.compile(application.encoding)
+
+    def __alias(self, publicid, encoding):
+        r'''Registers the FPI in the DTD string of an application's
+            specification as an alias of its public identifier, unless it's
+            already known.
+        '''
+        fpi = _fpi(encoding['dtd'])
+        if fpi != None and fpi != publicid:
+            self.__aliases.setdefault(fpi, publicid)
+
+    def __index(self):
+        r'''Loads the registered applications whose FPIs aren't known yet,
+            so any string public identifier can be matched against them.
+            Applications registered under an FPI, or having one registered as
+            an alias, are left out, as are those that fail to load.
+        '''
+        if self.__indexed:
+            return
+
+        with self.__lock:
+            if self.__indexed:
+                return
+
+            known = set(self.__aliases.values())
+            for publicid in list(self.__applications):
+                if isinstance(publicid, str) or publicid in known:
+                    continue
+
+                try:
+                    self.encoding(publicid)
+                except (ImportError, AttributeError, KeyError, TypeError):
+                    pass
+
+            self.__indexed = True
+
+    def __discover(self):
+        r'''Registers the applications published under the registry's entry
+            point group, if that wasn't done yet. Applications registered
+            directly take precedence over plugins.
+        '''
+        if self.__group == None:
+            return
+
+        with self.__lock:
+            group = self.__group
+            if group == None:
+                return
+
+            for point in _entrypoints(group):
+                publicid = _publicid(point.name)
+                if publicid not in self.__applications:
+                    self.__applications[publicid] = point
+                    self.__indexed = False
+
+            self.__group = None
+
+
+def _publicid(name):
+    r'''Returns the public identifier given by a string, either a binary code
+        (e.g. '0x2A') or an FPI.
+    '''
+    try:
+        return int(name, 0)
+    except ValueError:
+        return name
+
+
+def _fpi(dtd):
+    r'''Returns the formal public identifier in a DTD string, or None if it
+        has none.
+    '''
+    match = search(r'''\bPUBLIC\s+(?:"([^"]*)"|'([^']*)')''', dtd)
+    if match == None:
+        return None
+
+    return match.group(1) if match.group(1) != None else match.group(2)
+
+
+def _entrypoints(group):
+    r'''Returns the entry points of installed packages in the given group, or
+        an empty list if entry points can't be looked up.
+    '''
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            from pkg_resources import iter_entry_points
+        except ImportError:
+            return []
+
+        return list(iter_entry_points(group))
+
+    points = entry_points()
+    if hasattr(points, 'select'):
+        return list(points.select(group = group))
+
+    return list(points.get(group, []))
+
+
+# Registry of the applications known to DeWBXML, including plugins.
+_registry = wbxmlregistry(_applications, _plugins)
+
+
+def preload(publicids = None, compiler = None):
+    r'''Loads the known applications with the given public identifiers (all
+        of them by default) ahead of first use, compiling their decoders with
+        the given wbxmlcompiler object if any.
+
+        Worker processes forked afterwards share the loaded applications, so
+        they don't each have to load them again.
+    '''
+    _registry.preload(publicids, compiler)
 
 
 class wbxmlparser(object):
     r'''A DOM parser for Wireless Binary XML documents.
+
+        Parser objects only hold the known applications and charsets; all
+        state pertaining to a document is kept in a wbxmlcontext object
+        created for each call. Therefore parsing is reentrant, and a single
+        parser can be shared across threads.
     '''
-    def __init__(self, applications={}, charsets={}):
+    def __init__(self, applications={}, charsets={}, maxdepth = 1024, intern = False, opaque = 'base64', maxerrors = 100, compiler = None, nested = True):
         r'''Creates a new parser object.
+
+            Documents with elements nested deeper than maxdepth levels are
+            rejected with a ValueError exception; if maxdepth is None, nesting
+            depth is not limited.
+
+            If intern is True, inline strings (text and attribute values) are
+            interned, so documents kept in memory share a single copy of each
+            repeated string.
+
+            Opaque data is kept undecoded in wbxmlopaque objects, and encoded
+            in the given format ('base64', 'hex' or 'raw') only when output.
+            When parsing a bytearray in place, such objects refer directly to
+            its contents, so it must not be resized while they are in use.
+            If nested is True, opaque data of applications that enable nested
+            decoding (such as SyncML, which carries device information in
+            opaque data) is decoded by this parser the first time it's
+            accessed, if it holds a WBXML document of a known application,
+            and output as XML (see wbxmlopaque).
+
+            When parsing leniently, decoding of a document is abandoned after
+            maxerrors recoverable errors; if maxerrors is None, there's no
+            limit.
+
+            If a wbxmlcompiler object is given, applications are compiled into
+            specialized decoders on first use, which parse() uses instead of
+            the generic decoding loop. Applications that can't be compiled
+            are decoded by the generic loop.
         '''
-        self.__applications = dict(_applications)
-        self.__applications.update(applications)
+        self.__applications = wbxmlregistry(applications)
 
         self.__charsets = dict(_charsets)
         self.__charsets.update(charsets)
 
-        self.__encoding = None
-        self.__page = 0
-        self.__strings = []
+        self.__compiled = {}
+        self.__maxdepth = maxdepth
+        self.__intern = intern
+        self.__opaque = opaque
+        self.__nested = self if nested else None
+        self.__nesting = 0
+        self.__maxerrors = maxerrors
+        self.__compiler = compiler
 
-    def parse(self, data):
+    def parse(self, data, strict = False, stats = None):
         r'''Parses a WBXML file and returns a WBXML DOM document object.
 
-            If data is a string, it is interpreted as a path to a WBXML file;
-            otherwise, it's expected to be a wbxmlreader object.
+            If data is a wbxmlreader object, it's used as is; otherwise, a
+            reader is created over it, so data may be a path to a WBXML file, a
+            file-like object or a sequence of bytes.
+
+            If strict is True, the first error found is raised to the caller as
+            a wbxmlerror exception. Otherwise, errors are recorded in the
+            document's errors list. Recoverable errors, such as tokens missing
+            from the application's specification, are skipped over (unknown
+            elements are replaced by elements named "unknown", so their
+            contents are kept); any other error ends decoding, and the
+            document is returned as far as it could be parsed.
+
+            If a wbxmlstats object is given, decoding statistics are added to
+            it. Statistics are collected by a separate instrumented decoding
+            loop, so parsing without them is not slowed down at all.
+        '''
+        if not isinstance(data, wbxmlreader):
+            data = wbxmlreader(data)
+
+        context = wbxmlcontext(data, wbxmldocument())
+        context.stats = stats
+        context.strict = strict
+        start = data.offset
+        error = None
+        try:
+            self.__header(context)
+            if stats != None:
+                self.__countedbody(context)
+                stats.lap('body')
+            elif context.application.decoder != None:
+                self.__compiledbody(context)
+            else:
+                self.__body(context)
+        except wbxmlerror as e:
+            error = e
+        except StopIteration:
+            error = self.__error(context, 'Unexpected end of document')
+        except Exception as e:
+            error = self.__error(context, str(e))
+
+        if error != None:
+            if strict:
+                raise error
+            context.doc.errors.append(error)
+
+        if stats != None:
+            stats.documents += 1
+            stats.bytes += data.offset - start
+
+        return context.doc
+
+    def parsenested(self, data):
+        r'''Returns the WBXML document held in a buffer of opaque data, or None
+            if the buffer doesn't hold exactly one well-formed document of a
+            known application. Documents are parsed strictly, by a copy of
+            this parser one nesting level deeper, which stops decoding opaque
+            data _maxnesting levels down.
+        '''
+        # Only WBXML versions 1.0 to 1.3 are defined.
+        if len(data) < 4 or data[0] > 0x03:
+            return None
+
+        parser = copy(self)
+        parser.__nesting = self.__nesting + 1
+        parser.__nested = parser if parser.__nesting < _maxnesting else None
+
+        reader = wbxmlreader(bytes(data))
+        try:
+            document = parser.parse(reader, True)
+        except wbxmlerror:
+            return None
+
+        return document if reader.offset == len(data) else None
+
+    def parsestring(self, data, strict = False, stats = None):
+        r'''Parses a WBXML document held in memory and returns a WBXML DOM
+            document object.
+
+            The document is given as a bytes-like object: bytes, bytearray,
+            memoryview or any other object supporting the buffer protocol (see
+            wbxmlreader for which ones are decoded in place). Unlike parse(),
+            str and path object arguments are not accepted, since they can't be
+            told apart from paths (path objects even convert to bytes). Errors
+            and statistics are handled as for parse().
+        '''
+        if isinstance(data, (str, PathLike)):
+            raise TypeError('WBXML documents must be given as bytes-like objects, not ' + type(data).__name__)
+
+        return self.parse(wbxmlreader(_readbuffer(data)), strict, stats)
+
+    def iterparse(self, data):
+        r'''Parses a WBXML file incrementally, returning a generator of
+            (event, value) pairs instead of a DOM tree. Input is accepted in
+            the same forms as for parse().
+
+            The first event is ('document', document), where document is a
+            WBXML DOM document object with its header fields and string table
+            set, but no root element. It's followed by ('start', element) and
+            ('end', element) events for each element, ('text', string) events
+            for strings, and ('opaque', opaque) events for opaque data, where
+            opaque is a wbxmlopaque object. Elements are reported with their
+            attributes set, but are never added to their parents, so memory use
+            is independent of document size; parsing stops as soon as the
+            caller stops consuming events.
+
+            Unlike parse(), errors are raised to the caller, as wbxmlerror
+            exceptions. Running out of input ends the generator without an
+            error, so callers expecting a complete document should check that
+            the last 'end' event closes the root element.
+        '''
+        try:
+            context = self.begin(data)
+        except StopIteration:
+            return
+
+        yield ('document', context.doc)
+
+        for event in self.resume(context):
+            yield event
+
+    def begin(self, data):
+        r'''Parses the header and string table of a WBXML document, and
+            returns a wbxmlcontext object for decoding its body with resume().
+            The context's doc attribute is the WBXML DOM document object.
+            Input is accepted in the same forms as for parse().
         '''
-        if isinstance(data, basestring):
+        if not isinstance(data, wbxmlreader):
             data = wbxmlreader(data)
 
-        doc = wbxmldocument()
+        context = wbxmlcontext(data, wbxmldocument())
         try:
-            self.__version(data, doc)
-            self.__publicid(data, doc)
-            self.__charset(data, doc)
-            self.__stringtable(data, doc)
-            self.__body(data, doc)
+            self.__header(context)
+        except (wbxmlerror, StopIteration):
+            raise
         except Exception as e:
-            print_exc(file=stdout)
+            raise self.__error(context, str(e))
+
+        return context
 
-        return doc
+    def resume(self, context):
+        r'''Resumes parsing the body of a WBXML document from the current
+            position of the context's reader, returning a generator of events
+            as for iterparse().
 
-    def __get(self, *keys):
-        r'''Walks the current WBXML token specification, returning the object
-            (either leaf or subtree) at the end of the path.
+            The context's stack attribute is the list of elements open at that
+            position, and is updated in place as elements are opened and
+            closed. Since the context only changes once an event is complete,
+            a caller can restart parsing from the position of the last event
+            received (as done by wbxmlfeedparser when input runs out in the
+            middle of a token).
 
-            If the path is not found, raises a KeyError exception.
+            The generator ends when input runs out, even in the middle of a
+            token. Errors are raised as wbxmlerror exceptions.
         '''
-        data = self.__encoding['elements']
+        data = context.data
+        stack = context.stack
+        codec = context.codec
         try:
-            for key in keys:
-                data = data[key]
-            return data
-        except:
-            raise KeyError('(' + ', '.join([hex(k) for k in keys]) + ')')
+            for token in data:
+                if token == END:
+                    if len(stack) == 0:
+                        return
+                    yield ('end', stack.pop())
+                elif token == SWITCH_PAGE:
+                    self.__switchpage(context, data.read())
+                elif token == STR_I:
+                    yield ('text', self.__string(data, codec))
+                elif token == STR_T:
+                    yield ('text', context.strings[data.readint()])
+                elif token == OPAQUE:
+                    yield ('opaque', wbxmlopaque(data.readview(), self.__opaque, context.nested))
+                else:
+                    (node, hascontents) = self.__element(context, token)
+                    if hascontents:
+                        self.__checkdepth(context, len(stack) + 1)
+                    yield ('start', node)
+                    if hascontents:
+                        stack.append(node)
+                    else:
+                        yield ('end', node)
+        except StopIteration:
+            return
+        except wbxmlerror:
+            raise
+        except Exception as e:
+            raise self.__error(context, str(e))
+
+    def __application(self, token):
+        r'''Returns the compiled WBXML token specification for the given
+            public identifier (either a numeric token or a string).
+            Applications given to the parser take precedence over the known
+            ones, which are loaded from the registry. Specifications are
+            compiled on first use, and cached for later documents.
+        '''
+        application = self.__compiled.get(token)
+        if application == None:
+            try:
+                application = self.__applications.application(token)
+            except KeyError:
+                application = _registry.application(token)
+
+            if self.__compiler != None:
+                # Tables of known applications are shared, so decoders are
+                # set on a copy of their own.
+                application = copy(application)
+                try:
+                    application.decoder = self.__compiler.compile(application.encoding)
+                except Exception:
+                    application.decoder = None
+
+            self.__compiled[token] = application
+
+        return application
+
+    def __error(self, context, message, offset = None, token = None, node = None, page = None):
+        r'''Returns a wbxmlerror object for an error found while decoding a
+            document. Unless given, the offset and code page are the current
+            ones; the element path is that of the open elements, followed by
+            the given element node (if any).
+        '''
+        path = [element.name for element in context.stack]
+        if node != None:
+            path.append(node.name)
+
+        return wbxmlerror(
+            message,
+            offset if offset != None else context.data.offset,
+            token,
+            page if page != None else context.page,
+            path
+        )
+
+    def __recover(self, context, error):
+        r'''Handles a recoverable error. If decoding is strict the error is
+            raised; otherwise it's recorded in the document's errors list, so
+            decoding can go on. If too many errors were recorded already, an
+            error is raised to end decoding.
+        '''
+        if context.strict:
+            raise error
+
+        errors = context.doc.errors
+        errors.append(error)
+        if self.__maxerrors != None and len(errors) >= self.__maxerrors:
+            raise self.__error(context, 'Too many errors (' + str(len(errors)) + ')')
 
-    def __version(self, data, doc):
-        r'''Sets the version attribute of a WBXML DOM document object.
+    def __header(self, context):
+        r'''Parses the header and string table of a WBXML document, setting
+            the corresponding attributes of its WBXML DOM document object.
+        '''
+        data = context.data
+        stats = context.stats
+        if stats != None:
+            stats.start()
+
+        version = self.__version(context)
+        if stats != None:
+            stats.lap('version')
+
+        # The public identifier may be a reference to the string table, in
+        # which case it can only be resolved after the table is read.
+        publicid = data.readint()
+        index = data.readint() if publicid == 0 else None
+        if stats != None:
+            stats.lap('publicid')
+
+        self.__charset(context, version)
+        if stats != None:
+            stats.lap('charset')
+
+        self.__stringtable(context)
+        if stats != None:
+            stats.lap('stringtable')
+
+        self.__publicid(context, publicid if index == None else context.strings[index])
+        if stats != None:
+            stats.lap('publicid')
+            if index != None:
+                stats.hit(index)
+
+    def __version(self, context):
+        r'''Sets the version attribute of a WBXML DOM document object, and
+            returns the version token.
         '''
-        token = data.read()
+        token = context.data.read()
         minor = 0b1111 & token
         major = (token >> 4) + 1
-        doc.version = `major` + '.' + `minor`
+        context.doc.version = str(major) + '.' + str(minor)
+        return token
 
-    def __publicid(self, data, doc):
+    def __publicid(self, context, publicid):
         r'''Sets the schema attribute of a WBXML DOM document object. Also sets
-            the active WBXML token specification.
-        '''
-        token = data.read()
-        self.__encoding = self.__applications[token]
-        doc.schema = self.__encoding['dtd']
+            the document's WBXML token specification.
 
-    def __charset(self, data, doc):
-        r'''Sets the encoding attribute of a WBXML DOM document object.
+            The public identifier is either a numeric token or, if given as a
+            reference to the string table, a string.
         '''
-        token = data.read()
-        doc.encoding = self.__charsets[token]
-
-    def __stringtable(self, data, doc):
-        r'''Sets the string table of a WBXML DOM document object.
+        try:
+            context.application = self.__application(publicid)
+        except KeyError:
+            name = publicid if isinstance(publicid, str) else '0x%02X' % publicid
+            raise self.__error(context, 'Unknown public identifier: ' + name)
+
+        context.doc.schema = context.application.dtd
+        context.tags = context.application.page(context.page)
+        context.nested = self.__nested if context.application.nested else None
+
+    def __charset(self, context, version):
+        r'''Sets the encoding attribute of a WBXML DOM document object, and
+            the codec used to decode its strings. WBXML 1.0 documents have no
+            charset field, and are taken to be in the default charset.
         '''
-        length = data.read()
-        self.__strings = [data.read() for i in range(0, length)]
-        doc.stringtable = self.__strings
-
-    def __readstringtable(self, offset):
-        table = self.__strings
-        string = ''
-        for i in range(offset, len(table)):
-            code = table[i]
-            if code != 0x00:
-                string += chr(code)
+        offset = context.data.offset
+        charset = self.__charsets[_defaultcharset]
+        if version > 0:
+            token = context.data.readint()
+            if token in self.__charsets:
+                charset = self.__charsets[token]
             else:
-                break
+                self.__recover(context, self.__error(context, 'Unknown charset: ' + str(token), offset))
+
+        try:
+            context.codec = lookup(charset).name
+        except LookupError:
+            self.__recover(context, self.__error(context, 'Unsupported charset: ' + charset, offset))
+            charset = self.__charsets[_defaultcharset]
+            context.codec = lookup(charset).name
+
+        context.doc.encoding = charset
 
-        return string
+    def __stringtable(self, context):
+        r'''Sets the string table of a WBXML DOM document object.
+        '''
+        data = context.data
+        length = data.readint()
+        context.strings = wbxmlstringtable(data.read(length) if length > 0 else b'', context.codec)
+        context.doc.stringtable = context.strings
 
-    def __body(self, data, doc):
+    def __body(self, context):
         r'''Parses the body of a WBXML document, constructing the element DOM
             tree.
-        '''
-        self.__elements(data, doc)
 
-    def __elements(self, data, parent):
-        r'''Parses the children of a parent WBXML element, as well as their
-            children recursively.
+            Elements are decoded in a loop, keeping the chain of open elements
+            in an explicit stack (the context's stack attribute), so nesting
+            depth is only limited by the parser's maximum depth setting.
+            Decoding ends when the root element is complete; if the input ends
+            before that, an error is raised.
         '''
+        data = context.data
+        codec = context.codec
+        elements = context.application.elements
+        parent = context.doc
+        stack = context.stack
         for token in data:
-            node = None
             if token == END:
-                return
+                if len(stack) == 0:
+                    return
+                stack.pop()
+                if len(stack) == 0:
+                    return
+                parent = stack[-1]
+            elif token == SWITCH_PAGE:
+                page = context.page = data.read()
+                context.tags = elements[page] if page < len(elements) else _unknownpage
             elif token == STR_I:
-                node = wbxmlstring(data.readstring())
+                parent.addchild(wbxmlstring(self.__string(data, codec)))
+            elif token == STR_T:
+                parent.addchild(wbxmlstring(context.strings[data.readint()]))
             elif token == OPAQUE:
-                node = wbxmlstring(data.readopaque())
+                parent.addchild(wbxmlopaque(data.readview(), self.__opaque, context.nested))
             else:
-                (tag, hasattributes, hascontents) = (
-                    (0b00111111 & token),               # Base tag code
-                    ((0b10000000 & token) >> 7) == 1,   # "Has attributes" bit
-                    ((0b01000000 & token) >> 6) == 1    # "Has contents" bit
-                )
-
-                name = self.__get(self.__page, tag, 0)
-                node = wbxmlelement(name)
-                if hasattributes:
-                    self.__attributes(data, tag, node)
+                (node, hascontents) = self.__element(context, token)
+                parent.addchild(node)
                 if hascontents:
-                    self.__elements(data, node)
-            parent.addchild(node)
+                    self.__checkdepth(context, len(stack) + 1)
+                    stack.append(node)
+                    parent = node
+                elif len(stack) == 0:
+                    return
+
+        raise self.__error(context, 'Unexpected end of document')
+
+    def __compiledbody(self, context):
+        r'''Parses the body of a WBXML document as __body() does, using the
+            decoder compiled for the document's application. Tokens missing
+            from the compiled tables are handed back to the generic decoding
+            methods, so errors are handled the same way. Running out of input
+            raises StopIteration, which parse() reports as for __body().
+        '''
+        maxdepth = self.__maxdepth if self.__maxdepth != None else float('inf')
+        decoder = context.application.decoder
+        decoder(context, self.__element, self.__attributes, self.__string, self.__checkdepth, maxdepth, self.__opaque, context.nested)
+
+    def __countedbody(self, context):
+        r'''Parses the body of a WBXML document as __body() does, counting
+            decoded tokens in the context's statistics object.
+        '''
+        data = context.data
+        stats = context.stats
+        tokens = stats.tokens
+        codec = context.codec
+        parent = context.doc
+        stack = context.stack
+        for token in data:
+            if token == END:
+                if len(stack) == 0:
+                    return
+                stack.pop()
+                if len(stack) == 0:
+                    return
+                parent = stack[-1]
+            elif token == SWITCH_PAGE:
+                self.__switchpage(context, data.read())
+                tokens['SWITCH_PAGE'] += 1
+            elif token == STR_I:
+                parent.addchild(wbxmlstring(self.__string(data, codec)))
+                tokens['STR_I'] += 1
+            elif token == STR_T:
+                offset = data.readint()
+                parent.addchild(wbxmlstring(context.strings[offset]))
+                tokens['STR_T'] += 1
+                stats.hit(offset)
+            elif token == OPAQUE:
+                parent.addchild(wbxmlopaque(data.readview(), self.__opaque, context.nested))
+                tokens['OPAQUE'] += 1
+            else:
+                start = data.offset
+                (node, hascontents) = self.__element(context, token)
+                tokens['elements'] += 1
+                if start < data.offset:
+                    self.__countattributes(context, start)
 
-    def __attributes(self, data, element, node):
-        r'''Parses the attributes of a WBXML element.
+                parent.addchild(node)
+                if hascontents:
+                    self.__checkdepth(context, len(stack) + 1)
+                    stack.append(node)
+                    parent = node
+                elif len(stack) == 0:
+                    return
+
+        raise self.__error(context, 'Unexpected end of document')
+
+    def __countattributes(self, context, start):
+        r'''Counts the tokens of an attribute list already decoded from the
+            given offset, by scanning it again. This keeps the attribute
+            decoding code free of counting.
+        '''
+        data = context.data
+        end = data.offset
+        data.seek(start)
+        self.__skipattributes(context, context.stats)
+        data.seek(end)
+
+    def __skipattributes(self, context, stats = None):
+        r'''Skips over an attribute list up to its END token, without
+            decoding it. Tokens skipped are counted in the given statistics
+            object, if any.
         '''
+        data = context.data
         for token in data:
             if token == END:
                 return
             elif token == SWITCH_PAGE:
-                self.__page = data.read()
+                context.attributepage = data.read()
+                kind = 'SWITCH_PAGE'
+            elif token == STR_I:
+                data.readstring()
+                kind = 'STR_I'
+            elif token == STR_T:
+                offset = data.readint()
+                kind = 'STR_T'
+                if stats != None:
+                    stats.hit(offset)
+            elif token < 0x80:
+                kind = 'attributes'
             else:
-                self.__value(data, element, token, node)
+                kind = 'values'
+
+            if stats != None:
+                stats.tokens[kind] += 1
+
+        raise StopIteration()
+
+    def __string(self, data, codec):
+        r'''Reads an inline string in the given charset, interning it if the
+            parser is set to.
+        '''
+        string = data.readstring(codec)
+        return intern(string) if self.__intern else string
+
+    def __checkdepth(self, context, depth):
+        r'''Raises a wbxmlerror exception if the given element nesting depth
+            exceeds the parser's maximum depth.
+        '''
+        if self.__maxdepth != None and depth > self.__maxdepth:
+            raise self.__error(context, 'Maximum element depth (' + str(self.__maxdepth) + ') exceeded')
+
+    def __switchpage(self, context, page):
+        r'''Switches the tag code page, swapping in the page's elements table.
+        '''
+        context.page = page
+        context.tags = context.application.page(page)
+
+    def __element(self, context, token):
+        r'''Parses a WBXML element tag and its attributes, returning a pair
+            with the new element object and a flag indicating whether the
+            element has contents.
+        '''
+        element = context.tags[token]
+        if element == None:
+            return self.__unknown(context, token)
+
+        (tag, name, hasattributes, hascontents) = element
+        node = wbxmlelement(name)
+        if hasattributes:
+            context.attributepage = self.__attributes(context, tag, node, context.attributepage)
+
+        return (node, hascontents)
+
+    def __unknown(self, context, token):
+        r'''Handles an element token missing from the document's WBXML token
+            specification. When recovering from the error, the element's
+            attributes are skipped, and a placeholder element named "unknown"
+            is returned in its place, so its contents are still decoded.
+        '''
+        error = self.__error(context, 'Unknown element token', context.data.offset - 1, token)
 
-    def __value(self, data, element, attribute, node):
-        (name, value) = self.__get(self.__page, element, 1, attribute)
-        if value != None and not (isinstance(value, dict) or callable(value)):
-            node.attributes[name] = value
+        # Global tokens (entities, extensions, processing instructions etc.)
+        # have their own syntax, so decoding can't be resumed past them.
+        if 0b00111111 & token < 0x05:
+            raise error
+
+        self.__recover(context, error)
+        if token & 0x80:
+            self.__skipattributes(context)
+
+        return (wbxmlelement('unknown'), (token & 0x40) != 0)
+
+    def __attributes(self, context, element, node, page):
+        r'''Parses the attributes of a WBXML element, starting at the given
+            attribute code page. Returns the attribute code page in effect
+            after the attributes, so the active page only changes once the
+            element is fully read.
+        '''
+        data = context.data
+        for token in data:
+            if token == END:
+                return page
+            elif token == SWITCH_PAGE:
+                page = data.read()
+            else:
+                self.__value(context, element, token, node, page)
+
+        raise StopIteration()
+
+    def __value(self, context, element, attribute, node, page):
+        attributes = context.application.attributes
+        values = attributes[page][element] if page < len(attributes) else None
+        spec = values[attribute] if values != None else None
+        data = context.data
+        if spec == None:
+            self.__recover(context, self.__error(context, 'Unknown attribute token', data.offset - 1, attribute, node, page))
+            self.__skipvalue(context)
             return
 
-        token = data.read()
-        if token == STR_I:
-            node.attributes[name] = data.readstring()
-        elif token == STR_T:
-            offset = data.read()
-            node.attributes[name] = self.__readstringtable(offset)
-        elif value == None:
-            node.attributes[name] = str(token)
-        elif isinstance(value, dict):
-            node.attributes[name] = value[token]
-        else:
-            node.attributes[name] = value(node, token)
+        # An attribute value is the concatenation of the value prefix given
+        # by the attribute token (if any) and all strings and value tokens
+        # (i.e. tokens from 128 up) up to the next attribute token or END.
+        (name, kind, value) = spec
+        string = value if kind == _FIXED else ''
+        while True:
+            token = data.peek()
+            if token < 0x80 and token != STR_I:
+                break
+
+            data.read()
+            if token == STR_I:
+                string += self.__string(data, context.codec)
+            elif token == STR_T:
+                string += context.strings[data.readint()]
+            elif kind == _TABLE or kind == _FUNCTION:
+                try:
+                    string += value[token] if kind == _TABLE else value(node, token)
+                except (KeyError, IndexError):
+                    self.__recover(context, self.__error(context, 'Unknown attribute value token', data.offset - 1, token, node, page))
+            elif context.application.values[token] != None:
+                string += context.application.values[token]
+            else:
+                string += str(token)
+
+        node.attributes[name] = string
+
+    def __skipvalue(self, context):
+        r'''Skips over the strings and value tokens of an attribute value.
+        '''
+        data = context.data
+        while True:
+            token = data.peek()
+            if token < 0x80 and token != STR_I:
+                return
+
+            data.read()
+            if token == STR_I:
+                data.readstring()
+            elif token == STR_T:
+                data.readint()
+
+
+class wbxmlfeedparser(object):
+    r'''A push parser for Wireless Binary XML documents received in chunks
+        (e.g. concatenated SMS segments or chunked HTTP bodies).
+
+        Data is passed to the parser with feed() as it arrives. Events (as
+        described for wbxmlparser.iterparse()) are generated as soon as the
+        corresponding tokens are complete, and can be retrieved with events().
+        Input is buffered only until the token it belongs to is complete.
+    '''
+    def __init__(self, parser = None, tree = False):
+        r'''Creates a new push parser. Tokens are decoded by the given
+            wbxmlparser object, or by a default one if ommited.
+
+            If tree is True, a WBXML DOM tree is also built as events are
+            generated, so each element is complete (children included) by the
+            time its 'end' event is generated; otherwise, elements are not
+            added to their parents.
+        '''
+        self.__parser = parser if parser != None else wbxmlparser()
+        self.__tree = tree
+        self.__data = wbxmlreader(bytearray())
+        self.__context = None
+        self.__parents = []
+        self.__events = []
+        self.__done = False
+
+    def feed(self, data):
+        r'''Feeds a chunk of data to the parser.
+        '''
+        if self.__done:
+            return
+
+        self.__data.extend(data)
+        self.__decode()
+
+    def close(self):
+        r'''Signals the end of input, and returns the WBXML DOM document object
+            (which only has contents if the parser was created with tree set to
+            True). Raises a wbxmlerror if the document is incomplete.
+        '''
+        if not self.__done:
+            raise wbxmlerror('Unexpected end of document')
+
+        return self.__context.doc
+
+    def events(self):
+        r'''Returns the list of events generated since the last call, as
+            (event, value) pairs.
+        '''
+        events = self.__events
+        self.__events = []
+        return events
+
+    def __decode(self):
+        r'''Decodes as much of the buffered data as possible, then discards
+            the data already decoded.
+        '''
+        data = self.__data
+        if self.__context == None:
+            try:
+                self.__context = self.__parser.begin(data)
+            except StopIteration:
+                data.seek(0)
+                return
+
+            self.__add('document', self.__context.doc)
+
+        context = self.__context
+        checkpoint = data.offset
+        for (event, value) in self.__parser.resume(context):
+            checkpoint = data.offset
+            self.__add(event, value)
+            if event == 'end' and len(context.stack) == 0:
+                self.__done = True
+                break
+
+        data.seek(checkpoint)
+        data.discard()
+
+    def __add(self, event, value):
+        r'''Adds an event to the list of generated events, also adding the
+            corresponding node to the DOM tree if one is being built.
+        '''
+        self.__events.append((event, value))
+        if not self.__tree:
+            return
+
+        parents = self.__parents
+        if event == 'start':
+            (parents[-1] if len(parents) > 0 else self.__context.doc).addchild(value)
+            parents.append(value)
+        elif event == 'end':
+            parents.pop()
+        elif event == 'text':
+            parents[-1].addchild(wbxmlstring(value))
+        elif event == 'opaque':
+            parents[-1].addchild(value)
 
 
 def dialog():
     r'''Opens the input and output file dialogs, then calls the parse() function.
     '''
-    from Tkinter import Tk
-    import tkFileDialog
+    from tkinter import Tk, filedialog
     root = Tk()
     root.withdraw()
 
@@ -410,7 +2257,7 @@ def dialog():
 
     stdout.write('Path to the input WBXML file: ')
 
-    binary = tkFileDialog.askopenfilename(
+    binary = filedialog.askopenfilename(
         master = root,
         title = 'Open WBXML File',
         filetypes = [('Wireless Binary XML', '.wbxml'), ('All Files', '*')]
@@ -424,7 +2271,7 @@ def dialog():
 
     stdout.write('Path to the output plain-text XML file: ')
 
-    plain = tkFileDialog.asksaveasfilename(
+    plain = filedialog.asksaveasfilename(
         master = root,
         title = "Save Plain-Text XML File",
         defaultextension = ".xml",
@@ -452,17 +2299,193 @@ def parse(binary, plain = None):
         file if it is given; otherwise, the standard output is used.
     '''
     wbxml = wbxmlparser().parse(binary)
-    out = open(plain, 'w') if plain != None else stdout
-    out.write(str(wbxml))
-    if hasattr(out, 'close'):
-        out.close()
+    _writexml(wbxml, plain)
+
+    for error in wbxml.errors:
+        stderr.write(str(binary) + ': ' + str(error) + '\n')
+
+
+def parsebatch(inputs, output = None, workers = None, chunksize = 16, publicids = None, compiled = False):
+    r'''Parses a batch of input WBXML files across a pool of worker processes,
+        writing each result to a plain-text XML file.
+
+        Inputs may be paths to WBXML files or directories (searched recursively
+        for files with the .wbxml extension), glob patterns, or manifest files
+        (prefixed by '@') listing one input per line. Outputs are written with
+        the .xml extension to the output directory if it is given, keeping the
+        directory structure of inputs found in directories (or, for manifests
+        and glob patterns, below the deepest directory holding the files they
+        list); otherwise, they are written alongside their inputs.
+
+        If workers is None, one worker process is started per CPU; if it's 1,
+        files are parsed in the calling process. Files are dispatched to the
+        workers in chunks of the given size. Each worker creates a single
+        parser, which it uses for all files it's given. Applications are
+        loaded by each worker on first use, except for those with the given
+        public identifiers, which are loaded once before starting workers. If
+        compiled is True, applications are decoded by compiled decoders (see
+        wbxmlcompiler), generated into the default cache directory.
+
+        Returns a generator of (input, output, error) tuples in completion
+        order, where error is None if the file was parsed successfully, or a
+        string describing why it could not be parsed otherwise. Raises a
+        ValueError if two inputs would be written to the same output file, or
+        if any of the given public identifiers is unknown.
+    '''
+    for publicid in (publicids or []):
+        if publicid not in _registry:
+            name = publicid if isinstance(publicid, str) else '0x%02X' % publicid
+            raise ValueError('Unknown public identifier: ' + name)
+
+    tasks = [(binary, _batchoutput(binary, path, output)) for (binary, path) in _batchinputs(inputs)]
+
+    # Inputs sharing an output would be written over each other, possibly
+    # by two workers at the same time.
+    outputs = {}
+    for (binary, plain) in tasks:
+        key = normcase(abspath(plain))
+        if key in outputs:
+            raise ValueError('Inputs ' + outputs[key] + ' and ' + binary + ' are both written to ' + plain)
+        outputs[key] = binary
+    compiler = wbxmlcompiler() if compiled else None
+    if workers == 1:
+        _batchinit(compiler)
+        for task in tasks:
+            yield _batchtask(task)
+        return
+
+    if publicids != None:
+        preload(publicids, compiler)
+
+    from multiprocessing import Pool
+    pool = Pool(workers, _batchinit, (compiler,))
+    try:
+        for result in pool.imap_unordered(_batchtask, tasks, chunksize):
+            yield result
+    except BaseException:
+        pool.terminate()
+        raise
+
+    pool.close()
+    pool.join()
+
+
+def _batchinputs(inputs):
+    r'''Expands a list of batch inputs into (path, name) pairs, where name is
+        the path of the input file relative to the input it was found in. For
+        manifests and glob patterns, that's the deepest directory holding all
+        the files they list.
+    '''
+    for item in inputs:
+        if item.startswith('@'):
+            with open(item[1:]) as manifest:
+                paths = [line.strip() for line in manifest]
+
+            for pair in _batchnames([path for path in paths if path != '' and not path.startswith('#')]):
+                yield pair
+        elif isdir(item):
+            for (root, folders, files) in walk(item):
+                folders.sort()
+                for name in sorted(files):
+                    if name.lower().endswith('.wbxml'):
+                        path = join(root, name)
+                        yield (path, relpath(path, item))
+        else:
+            for pair in _batchnames(sorted(glob(item)) or [item]):
+                yield pair
+
+
+def _batchnames(paths):
+    r'''Returns (path, name) pairs for a list of input files, where name is
+        the path of each file relative to the deepest directory holding all
+        of them, so files of the same name in different directories are told
+        apart.
+    '''
+    if len(paths) == 0:
+        return []
+
+    root = commonpath([dirname(abspath(path)) for path in paths])
+    return [(path, relpath(abspath(path), root)) for path in paths]
+
+
+def _batchoutput(binary, name, output):
+    r'''Returns the path of the plain-text XML file for a batch input.
+    '''
+    if output == None:
+        return splitext(binary)[0] + '.xml'
+
+    return join(output, splitext(name)[0] + '.xml')
+
+
+# Parser object used by the current batch worker process.
+_batchparser = None
+
+# Compiler of the decoders used by batch worker processes.
+def _batchinit(compiler):
+    r'''Initializes a batch worker process, with a parser using the given
+        wbxmlcompiler object, if any.
+    '''
+    global _batchparser
+    _batchparser = wbxmlparser(compiler = compiler)
+
+
+def _batchtask(task):
+    r'''Parses a single file in a batch worker process, returning a tuple
+        (input, output, error) as described for parsebatch().
+    '''
+    (binary, plain) = task
+    try:
+        wbxml = _batchparser.parse(binary, strict = True)
+        folder = dirname(plain)
+        if folder != '' and not isdir(folder):
+            try:
+                makedirs(folder)
+            except OSError:
+                if not isdir(folder):
+                    raise
+
+        _writexml(wbxml, plain)
+    except Exception as e:
+        return (binary, plain, type(e).__name__ + ': ' + str(e))
+
+    return (binary, plain, None)
+
+
+def batch(args):
+    r'''Parses a batch of WBXML files according to the given command-line
+        arguments, reporting failed files to the standard error. Returns the
+        number of files that could not be parsed.
+    '''
+    from getopt import getopt
+
+    (options, inputs) = getopt(args, 'j:c:o:p:C')
+    publicids = [_publicid(value) for (option, value) in options if option == '-p'] or None
+    options = dict(options)
+    workers = int(options['-j']) if '-j' in options else None
+    chunksize = int(options.get('-c', 16))
+    output = options.get('-o')
+    compiled = '-C' in options
+
+    errors = 0
+    try:
+        for (binary, plain, error) in parsebatch(inputs, output, workers, chunksize, publicids, compiled):
+            if error != None:
+                stderr.write(binary + ': ' + error + '\n')
+                errors += 1
+    except ValueError as e:
+        stderr.write(str(e) + '\n')
+        return errors + 1
+
+    return errors
 
 
 def main():
     r'''Function invoked when this module is ran as a script.
     '''
     import sys
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        sys.exit(1 if batch(sys.argv[2:]) > 0 else 0)
+    elif len(sys.argv) > 1:
         parse(*sys.argv[1:])
     else:
         dialog()
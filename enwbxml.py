@@ -0,0 +1,711 @@
+#! /usr/bin/env python3
+#coding=utf-8
+
+r'''Converter of plain-text XML documents to Wireless Binary XML (WBXML).
+
+    The program is invoked from command line with either two arguments (the
+    input and output paths) or just one (in which case the output is written
+    to standard output). The WBXML application is selected by matching the
+    input document's DOCTYPE against the DTD strings of known applications.
+
+    If the -O option is given before the paths, the output is optimized for
+    size, and the achieved size is reported against that of a naive encoding:
+
+        enwbxml.py -O input.xml output.wbxml
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+__version__ = '1.0.0'
+
+import dewbxml
+
+from dewbxml import wbxmlapplication, wbxmldocument, wbxmlelement, wbxmlopaque, wbxmlstring
+from dewbxml import SWITCH_PAGE, END, STR_I, STR_T, OPAQUE
+from dewbxml import _FIXED, _STRING, _TABLE, _FUNCTION
+
+from codecs import lookup
+from getopt import getopt
+from re     import search
+from sys    import stderr, stdout
+
+
+def _mbint(value):
+    r'''Encodes an integer as a multi-byte unsigned integer (mb_u_int32),
+        returned as a bytearray.
+    '''
+    data = bytearray([value & 0x7F])
+    value >>= 7
+    while value > 0:
+        data.insert(0, 0x80 | (value & 0x7F))
+        value >>= 7
+
+    return data
+
+
+def _codec(name):
+    r'''Returns the normalized name of the codec for a charset name, or the
+        name itself if Python has no codec for it.
+    '''
+    try:
+        return lookup(name).name
+    except LookupError:
+        return name
+
+
+def _counts(*ops):
+    r'''Returns a dictionary mapping each string in the given lists of
+        operations to the number of times it occurs in them.
+    '''
+    counts = {}
+    for parts in ops:
+        for op in parts:
+            if isinstance(op, str):
+                counts[op] = counts.get(op, 0) + 1
+
+    return counts
+
+
+def _price(string, counts):
+    r'''Returns the estimated size in bytes of a string written to the body
+        of a document where it occurs the given number of times: inline, or
+        as a string table reference (usually two bytes) plus a share of the
+        table entry, whichever is smaller.
+    '''
+    count = counts.get(string, 0)
+    inline = len(string) + 2
+    if count < 2:
+        return inline
+
+    return min(inline, 2 + (len(string) + 1.0) / count)
+
+
+class wbxmlencoder(object):
+    r'''An encoder of WBXML DOM documents to Wireless Binary XML.
+
+        Reverse lookup tables (element name to token, attribute name and value
+        to token) are computed once from the application's token
+        specification when the encoder is created, and used for all documents
+        it encodes.
+
+        By default, attribute tokens with pre-defined values are preferred,
+        and strings are moved to the string table whenever that saves space.
+        In optimized mode, the encoder further chooses among all the ways an
+        attribute can be written -- value prefixes given by attribute tokens,
+        attribute value tokens (e.g. WML's "http://www.") and strings -- the
+        one taking the least space.
+    '''
+    def __init__(self, publicid, encoding = None, charsets = {}):
+        r'''Creates a new encoder for the application with the given public
+            identifier (either a numeric token or a string).
+
+            If the token specification is ommited, it's looked up among the
+            applications known to DeWBXML. Charsets known to DeWBXML can be
+            extended by a dictionary mapping charset names to their tokens
+            (IANA MIBenum numbers); documents in charsets without a token
+            can't be encoded.
+        '''
+        if encoding == None:
+            encoding = dewbxml._registry.encoding(publicid)
+
+        self.__publicid = publicid
+
+        # Codec name -> charset token, so any alias of a charset is found.
+        self.__charsets = dict((_codec(name), token) for (token, name) in dewbxml._charsets.items())
+        for (name, token) in charsets.items():
+            self.__charsets[_codec(name)] = token
+
+        application = wbxmlapplication(encoding)
+        self.__pages = range(len(application.elements))
+
+        # Element name -> {page: tag}
+        self.__tags = {}
+
+        # (page, tag) -> ({(name, value): token}, {name: (token, kind, value)},
+        #                 {name: [(value prefix, token)]})
+        self.__attributes = {}
+
+        # [(value string, token)] for attribute value tokens
+        self.__values = [(value, token) for (token, value) in enumerate(application.values) if value != None]
+
+        for page in self.__pages:
+            for element in application.elements[page]:
+                if element != None:
+                    (tag, name) = element[:2]
+                    self.__tags.setdefault(name, {})[page] = tag
+
+            for (tag, values) in enumerate(application.attributes[page]):
+                if values == None:
+                    continue
+
+                fixed = {}
+                other = {}
+                prefixes = {}
+                for (token, spec) in enumerate(values):
+                    if spec == None:
+                        continue
+
+                    (name, kind, value) = spec
+                    if kind == _FIXED:
+                        fixed.setdefault((name, value), token)
+                        prefixes.setdefault(name, []).append((value, token))
+                    elif kind == _TABLE:
+                        reverse = dict((string, code) for (code, string) in value.items())
+                        other.setdefault(name, (token, kind, reverse))
+                    else:
+                        other.setdefault(name, (token, kind, value))
+
+                self.__attributes[(page, tag)] = (fixed, other, prefixes)
+
+        # Tokens found for values decoded by functions, indexed by function,
+        # value and attributes the function may depend on.
+        self.__functions = {}
+
+    def encode(self, doc, optimize = False):
+        r'''Encodes a WBXML DOM document object (or a single element object,
+            taken as the document root) and returns the result as a string.
+
+            If optimize is True, the encoding taking the least space is
+            chosen for each attribute, and the string table is laid out so
+            the most referenced strings get the shortest offsets. Since the
+            choices are made one attribute at a time, the result is checked
+            against the default encoding, and the shorter one is returned.
+        '''
+        return self.__encode(doc, True, optimize)
+
+    def measure(self, doc):
+        r'''Returns a tuple (naive, optimized) with the sizes in bytes of the
+            given document encoded naively (attributes encoded as by default,
+            but all strings inline) and in optimized mode.
+        '''
+        return (len(self.__encode(doc, False, False)), len(self.__encode(doc, True, True)))
+
+    def __encode(self, doc, stringtable, optimize):
+        r'''Encodes a document, using the string table for document strings
+            only if stringtable is True.
+        '''
+        if not isinstance(doc, wbxmldocument):
+            root = doc
+            doc = wbxmldocument()
+            doc.addchild(root)
+
+        ops = []
+        self.__body(doc.root, ops)
+        if not optimize:
+            return self.__output(doc, ops, stringtable, False)
+
+        # Strings are priced by how often they occur in the document, since
+        # repeated strings end up in the string table. Counts are taken from
+        # the default encoding, where values are never split, and then also
+        # from an encoding pricing all strings as inline, where values are
+        # split wherever tokens save space, so strings shared by segments of
+        # different values are priced as such too. The latter encoding is a
+        # candidate as well, and the shortest of all is returned.
+        best = self.__output(doc, list(ops), stringtable, False)
+        split = []
+        self.__body(doc.root, split, {})
+        for counts in (_counts(ops), _counts(ops, split), {}):
+            ops = []
+            self.__body(doc.root, ops, counts)
+            data = self.__output(doc, ops, stringtable, True)
+            if len(data) <= len(best):
+                best = data
+
+        return best
+
+    def __output(self, doc, ops, stringtable, optimize):
+        r'''Returns the WBXML encoding of a document, given the operations its
+            body was converted into. If optimize is True, the string table is
+            laid out for size (see __stringtable()).
+        '''
+        # Strings are encoded to the document's charset, surrogate escapes
+        # (from bytes not valid in the charset) going back to the original
+        # bytes. From here on, bytes objects are strings, and bytearrays are
+        # output as is.
+        codec = lookup(doc.encoding or 'utf-8').name
+        if codec not in self.__charsets:
+            raise KeyError('Unknown charset: ' + doc.encoding)
+
+        for (i, op) in enumerate(ops):
+            if isinstance(op, str):
+                ops[i] = op.encode(codec, 'surrogateescape')
+
+        publicid = self.__publicid
+        if isinstance(publicid, str):
+            publicid = publicid.encode(codec)
+
+        strings = [publicid] if isinstance(publicid, bytes) else []
+        if stringtable:
+            for op in ops:
+                if isinstance(op, bytes):
+                    strings.append(op)
+
+        (table, offsets) = self.__stringtable(strings, publicid, optimize)
+
+        # WBXML 1.0 documents have no charset field.
+        version = self.__version(doc.version)
+        data = bytearray()
+        data.append(version)
+        if isinstance(publicid, bytes):
+            data.extend(_mbint(0))
+            data.extend(_mbint(offsets[publicid]))
+        else:
+            data.extend(_mbint(publicid))
+        if version > 0:
+            data.extend(_mbint(self.__charsets[codec]))
+        data.extend(_mbint(len(table)))
+        data.extend(table)
+
+        for op in ops:
+            if isinstance(op, int):
+                data.append(op)
+            elif isinstance(op, bytearray):
+                data.extend(op)
+            elif op in offsets:
+                data.append(STR_T)
+                data.extend(_mbint(offsets[op]))
+            else:
+                data.append(STR_I)
+                data.extend(op)
+                data.append(0x00)
+
+        return bytes(data)
+
+    def __version(self, version):
+        r'''Returns the version token for a version string such as "1.3".
+        '''
+        try:
+            (major, minor) = [int(part) for part in version.split('.')]
+            return ((major - 1) << 4) | minor
+        except ValueError:
+            return 0x03
+
+    def __stringtable(self, strings, publicid, optimize = False):
+        r'''Builds a string table from the list of all strings in a document
+            (given as bytes), in order of occurrence -- or, if optimize is
+            True, in decreasing order of occurrence count per byte of table
+            space, so short and often referenced strings get offsets that fit
+            in a single byte. Only strings for which table references take
+            less space than inline strings are added. A public identifier
+            given as bytes always goes first.
+
+            Returns the table's contents and a dictionary mapping each string
+            in the table to its offset.
+        '''
+        counts = {}
+        for string in strings:
+            counts[string] = counts.get(string, 0) + 1
+
+        table = bytearray()
+        offsets = {}
+        if isinstance(publicid, bytes):
+            offsets[publicid] = 0
+            table.extend(publicid)
+            table.append(0x00)
+
+        if optimize:
+            order = {}
+            for string in strings:
+                order.setdefault(string, len(order))
+            strings = sorted(order, key = lambda string: (-counts[string] / (len(string) + 1.0), order[string]))
+
+        for string in strings:
+            if string in offsets:
+                continue
+
+            count = counts[string]
+            inline = count * (len(string) + 2)
+            reference = len(string) + 1 + count * (1 + len(_mbint(len(table))))
+            if reference < inline:
+                offsets[string] = len(table)
+                table.extend(string)
+                table.append(0x00)
+
+        return (table, offsets)
+
+    def __body(self, root, ops, counts = None):
+        r'''Converts the element tree under the given root into a list of
+            operations, where integers are single bytes, bytearrays are
+            output as is, and strings are output either inline or as string
+            table references.
+
+            If the occurrence counts of the document's strings are given,
+            attributes are encoded in optimized mode.
+
+            Tag and attribute code pages are switched independently, as
+            specified by WBXML.
+        '''
+        page = 0
+        attributepage = 0
+        pending = [root]
+        while len(pending) > 0:
+            node = pending.pop()
+            if node == None:
+                ops.append(END)
+                continue
+            elif isinstance(node, wbxmlopaque):
+                data = bytearray(node.data)
+                ops.append(OPAQUE)
+                ops.append(_mbint(len(data)))
+                ops.append(data)
+                continue
+            elif not isinstance(node, wbxmlelement):
+                ops.append(node.value if isinstance(node, wbxmlstring) else str(node))
+                continue
+
+            tags = self.__tags.get(node.name)
+            if tags == None:
+                raise KeyError('Unknown element: ' + node.name)
+
+            if page not in tags:
+                page = min(tags)
+                ops.append(SWITCH_PAGE)
+                ops.append(page)
+
+            tag = tags[page]
+            attributes = node.attributes
+            children = node.children
+            token = tag | (0x80 if len(attributes) > 0 else 0) | (0x40 if len(children) > 0 else 0)
+            ops.append(token)
+
+            if len(attributes) > 0:
+                attributepage = self.__attributelist(node, attributepage, tag, ops, counts)
+                ops.append(END)
+
+            if len(children) > 0:
+                pending.append(None)
+                for i in range(len(children) - 1, -1, -1):
+                    pending.append(children[i])
+
+    def __attributelist(self, node, page, tag, ops, counts):
+        r'''Converts the attributes of an element into operations, starting at
+            the given attribute code page, and returns the attribute code page
+            in effect afterwards.
+
+            Attributes whose values are decoded by functions are converted
+            last, since such functions may depend on other attributes of the
+            element (e.g. the provisioning "value" attribute depends on "name").
+        '''
+        attributes = node.attributes.items()
+        later = []
+        decoded = wbxmlelement(node.name)
+        for (name, value) in attributes:
+            spec = self.__find(page, tag, name, value)
+            if spec != None and spec[2] == _FUNCTION:
+                later.append((name, value))
+            else:
+                page = self.__attribute(decoded, page, tag, name, value, ops, counts)
+
+        for (name, value) in later:
+            page = self.__attribute(decoded, page, tag, name, value, ops, counts)
+
+        return page
+
+    def __find(self, page, tag, name, value):
+        r'''Returns the specification for an attribute on the given page as a
+            tuple (token, kind, value), or None if there's none.
+        '''
+        specs = self.__attributes.get((page, tag))
+        if specs == None:
+            return None
+
+        (fixed, other, prefixes) = specs
+        token = fixed.get((name, value))
+        if token != None:
+            return (token, _FIXED, value)
+
+        return other.get(name)
+
+    def __attribute(self, decoded, page, tag, name, value, ops, counts):
+        r'''Converts a single attribute into operations, switching code pages
+            if the attribute is only defined in another page. Returns the code
+            page in effect afterwards.
+
+            Attribute tokens with pre-defined values are preferred, then tokens
+            whose values are encoded as tokens, and finally inline or string
+            table values. In optimized mode (when string occurrence counts are
+            given), the shortest encoding is chosen instead.
+        '''
+        candidates = [page] + [other for other in self.__pages if other != page]
+        if counts != None:
+            best = self.__shortest(decoded, candidates, tag, name, value, counts)
+            if best == None:
+                raise KeyError('Unknown attribute: ' + decoded.name + ' ' + name + '="' + value + '"')
+
+            (candidate, parts) = best
+            if candidate != page:
+                ops.append(SWITCH_PAGE)
+                ops.append(candidate)
+
+            ops.extend(parts)
+            decoded.attributes[name] = value
+            return candidate
+
+        best = None
+        for candidate in candidates:
+            spec = self.__find(candidate, tag, name, value)
+            if spec == None:
+                continue
+
+            token = self.__valuetoken(decoded, spec, value)
+            if spec[1] == _FIXED or token != None:
+                best = (candidate, spec, token)
+                break
+
+            if best == None:
+                best = (candidate, spec, None)
+
+        if best == None:
+            raise KeyError('Unknown attribute: ' + decoded.name + ' ' + name + '="' + value + '"')
+
+        (candidate, (token, kind, spec), valuetoken) = best
+        if candidate != page:
+            ops.append(SWITCH_PAGE)
+            ops.append(candidate)
+
+        ops.append(token)
+        if kind != _FIXED:
+            ops.append(valuetoken if valuetoken != None else value)
+
+        decoded.attributes[name] = value
+        return candidate
+
+    def __shortest(self, decoded, candidates, tag, name, value, counts):
+        r'''Returns the shortest encoding of an attribute among the given
+            code pages (the first one being the current page) as a tuple
+            (page, operations), or None if the attribute can't be encoded.
+
+            The string table is only laid out once the whole document is
+            converted, so string sizes are estimated from the number of times
+            each string occurs in the document: a repeated string is priced
+            as a table reference plus its share of the table entry, and any
+            other string as if written inline. Splitting a repeated value
+            into segments thus doesn't look cheaper than sharing it.
+        '''
+        best = None
+        for candidate in candidates:
+            specs = self.__attributes.get((candidate, tag))
+            if specs == None:
+                continue
+
+            (fixed, other, prefixes) = specs
+            options = []
+            for (prefix, token) in prefixes.get(name, []):
+                if value.startswith(prefix):
+                    options.append([token] + self.__segments(value[len(prefix):], counts))
+
+            spec = other.get(name)
+            if spec != None:
+                valuetoken = self.__valuetoken(decoded, spec, value)
+                if valuetoken != None:
+                    options.append([spec[0], valuetoken])
+                elif spec[1] == _STRING:
+                    options.append([spec[0]] + self.__segments(value, counts))
+                else:
+                    options.append([spec[0], value])
+
+            switch = 0 if candidate == candidates[0] else 2
+            for parts in options:
+                size = switch + sum(1 if isinstance(part, int) else _price(part, counts) for part in parts)
+                if best == None or size < best[0]:
+                    best = (size, candidate, parts)
+
+        return best[1:] if best != None else None
+
+    def __segments(self, value, counts):
+        r'''Splits a string into the shortest sequence of attribute value
+            tokens and strings that concatenate to it, returned as a list of
+            integers (tokens) and strings. Strings are priced as described
+            for __shortest(), given the occurrence counts of strings in the
+            document.
+        '''
+        length = len(value)
+        matches = [[] for i in range(length + 1)]
+        for (string, token) in self.__values:
+            start = value.find(string)
+            while start >= 0:
+                matches[start].append((start + len(string), token))
+                start = value.find(string, start + 1)
+
+        # shortest[i] = (size, end, part) for the suffix starting at i
+        shortest = [None] * length + [(0, None, None)]
+        for i in range(length - 1, -1, -1):
+            best = None
+            for (end, token) in matches[i]:
+                size = 1 + shortest[end][0]
+                if best == None or size < best[0]:
+                    best = (size, end, token)
+
+            for end in range(i + 1, length + 1):
+                if end < length and len(matches[end]) == 0:
+                    continue
+
+                size = _price(value[i:end], counts) + shortest[end][0]
+                if best == None or size < best[0]:
+                    best = (size, end, value[i:end])
+
+            shortest[i] = best
+
+        parts = []
+        i = 0
+        while i < length:
+            (size, i, part) = shortest[i]
+            parts.append(part)
+
+        return parts
+
+    def __valuetoken(self, decoded, spec, value):
+        r'''Returns the value token encoding an attribute value, or None if
+            the value must be encoded as a string.
+        '''
+        (token, kind, values) = spec
+        if kind == _TABLE:
+            return values.get(value)
+        elif kind != _FUNCTION:
+            return None
+
+        key = (values, value, tuple(sorted(decoded.attributes.items())))
+        if key in self.__functions:
+            return self.__functions[key]
+
+        found = None
+        for code in range(256):
+            if code in (STR_I, STR_T):
+                continue
+            try:
+                if values(decoded, code) == value:
+                    found = code
+                    break
+            except (KeyError, IndexError, TypeError):
+                pass
+
+        self.__functions[key] = found
+        return found
+
+
+def parsexml(text):
+    r'''Parses a plain-text XML document (as output by DeWBXML), given as
+        bytes or as a string, and returns a WBXML DOM document object.
+
+        Names are taken as they appear in the document, without namespace
+        processing. Leading and trailing whitespace is removed from text
+        contents, and whitespace-only text is ignored.
+    '''
+    from xml.parsers.expat import ParserCreate
+
+    doc = wbxmldocument()
+    doc.version = '1.3'
+    doc.encoding = 'utf-8'
+
+    parents = [doc]
+    chunks = []
+
+    def flush():
+        text = ''.join(chunks).strip()
+        del chunks[:]
+        if text != '':
+            parents[-1].addchild(wbxmlstring(text))
+
+    def declaration(version, encoding, standalone):
+        if encoding != None:
+            doc.encoding = encoding
+
+    def doctype(name, system, public, internal):
+        schema = name
+        if public != None:
+            schema += ' PUBLIC "' + public + '"'
+        elif system != None:
+            schema += ' SYSTEM'
+        if system != None:
+            schema += ' "' + system + '"'
+        doc.schema = schema
+
+    def comment(data):
+        version = search(r'^ WBXML version: (\S+) $', data)
+        if version != None:
+            doc.version = version.group(1)
+
+    def start(name, attributes):
+        flush()
+        node = wbxmlelement(name)
+        for i in range(0, len(attributes), 2):
+            node.attributes[attributes[i]] = attributes[i + 1]
+        parents[-1].addchild(node)
+        parents.append(node)
+
+    def end(name):
+        flush()
+        parents.pop()
+
+    parser = ParserCreate()
+    parser.ordered_attributes = True
+    parser.XmlDeclHandler = declaration
+    parser.StartDoctypeDeclHandler = doctype
+    parser.CommentHandler = comment
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = chunks.append
+    parser.Parse(text, True)
+
+    return doc
+
+
+def _publicid(schema):
+    r'''Returns the public identifier of the known application with the
+        formal public identifier (FPI) given in a DTD string. Applications
+        registered under a numeric public identifier are returned that,
+        otherwise the FPI itself is returned.
+    '''
+    fpi = dewbxml._fpi(schema)
+    if fpi != None and fpi in dewbxml._registry:
+        return dewbxml._registry.resolve(fpi)
+
+    raise KeyError('Unknown application: ' + schema)
+
+
+def encode(plain, binary = None, optimize = False):
+    r'''Encodes an input plain-text XML file. Results are written to a WBXML
+        output file if it is given; otherwise, the standard output is used.
+
+        If optimize is True, the output is optimized for size, and the sizes
+        of the naive and optimized encodings are reported to standard error.
+    '''
+    with open(plain, 'rb') as file:
+        doc = parsexml(file.read())
+
+    encoder = wbxmlencoder(_publicid(doc.schema))
+    data = encoder.encode(doc, optimize)
+    if optimize:
+        (naive, size) = encoder.measure(doc)
+        saved = 100.0 * (naive - size) / naive if naive > 0 else 0.0
+        stderr.write('%d bytes (naive encoding: %d bytes, %.1f%% smaller)\n' % (size, naive, saved))
+
+    if binary == None:
+        stdout.buffer.write(data)
+        stdout.buffer.flush()
+        return
+
+    with open(binary, 'wb') as out:
+        out.write(data)
+
+
+def main():
+    r'''Function invoked when this module is ran as a script.
+    '''
+    import sys
+    (options, paths) = getopt(sys.argv[1:], 'O')
+    encode(*paths, optimize = len(options) > 0)
+
+
+# Command-line entry point
+if __name__ == '__main__':
+    main()
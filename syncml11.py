@@ -0,0 +1,107 @@
+#coding=utf-8
+
+r'''WBXML specification for the SyncML 1.1 representation protocol.
+
+    Page 0 holds the tags of SyncML itself, and page 1 those of the meta
+    information (MetInf) namespace, used within Meta elements. Device
+    information (DevInf) documents are not part of SyncML packages proper,
+    but are usually embedded in them as opaque data (see devinf11.py), so
+    nested decoding is enabled for this application.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+__version__ = '1.0.0'
+
+_syncml = { # Page 0
+    0x05: ('Add', None),
+    0x06: ('Alert', None),
+    0x07: ('Archive', None),
+    0x08: ('Atomic', None),
+    0x09: ('Chal', None),
+    0x0A: ('Cmd', None),
+    0x0B: ('CmdID', None),
+    0x0C: ('CmdRef', None),
+    0x0D: ('Copy', None),
+    0x0E: ('Cred', None),
+    0x0F: ('Data', None),
+    0x10: ('Delete', None),
+    0x11: ('Exec', None),
+    0x12: ('Final', None),
+    0x13: ('Get', None),
+    0x14: ('Item', None),
+    0x15: ('Lang', None),
+    0x16: ('LocName', None),
+    0x17: ('LocURI', None),
+    0x18: ('Map', None),
+    0x19: ('MapItem', None),
+    0x1A: ('Meta', None),
+    0x1B: ('MsgID', None),
+    0x1C: ('MsgRef', None),
+    0x1D: ('NoResp', None),
+    0x1E: ('NoResults', None),
+    0x1F: ('Put', None),
+    0x20: ('Replace', None),
+    0x21: ('RespURI', None),
+    0x22: ('Results', None),
+    0x23: ('Search', None),
+    0x24: ('Sequence', None),
+    0x25: ('SessionID', None),
+    0x26: ('SftDel', None),
+    0x27: ('Source', None),
+    0x28: ('SourceRef', None),
+    0x29: ('Status', None),
+    0x2A: ('Sync', None),
+    0x2B: ('SyncBody', None),
+    0x2C: ('SyncHdr', None),
+    0x2D: ('SyncML', None),
+    0x2E: ('Target', None),
+    0x2F: ('TargetRef', None),
+    0x31: ('VerDTD', None),
+    0x32: ('VerProto', None),
+    0x33: ('NumberOfChanges', None),
+    0x34: ('MoreData', None)
+}
+
+_metinf = { # Page 1
+    0x05: ('Anchor', None),
+    0x06: ('EMI', None),
+    0x07: ('Format', None),
+    0x08: ('FreeID', None),
+    0x09: ('FreeMem', None),
+    0x0A: ('Last', None),
+    0x0B: ('Mark', None),
+    0x0C: ('MaxMsgSize', None),
+    0x0D: ('Mem', None),
+    0x0E: ('MetInf', None),
+    0x0F: ('Next', None),
+    0x10: ('NextNonce', None),
+    0x11: ('SharedMem', None),
+    0x12: ('Size', None),
+    0x13: ('Type', None),
+    0x14: ('Version', None),
+    0x15: ('MaxObjSize', None)
+}
+
+encoding = {
+    # The XML application's DTD string.
+    'dtd': r'SyncML PUBLIC "-//SYNCML//DTD SyncML 1.1//EN" "http://www.syncml.org/docs/syncml_represent_v11_20020213.dtd"',
+
+    # Opaque data may hold device information documents, to be decoded.
+    'nested': True,
+
+    # Token codes for the XML application's elements.
+    'elements': [
+        _syncml,
+        _metinf
+    ]
+}
@@ -0,0 +1,54 @@
+#coding=utf-8
+
+r'''WBXML specification for the SyncML 1.2 representation protocol.
+
+    SyncML 1.2 extends the tag tables of SyncML 1.1 (see syncml11.py) with
+    the tags of filtering, hierarchical synchronization and suspend/resume.
+    Like SyncML 1.1, it carries device information as opaque data.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+__version__ = '1.0.0'
+
+import syncml11
+
+_syncml = dict(syncml11._syncml)
+_syncml.update({
+    0x35: ('Field', None),
+    0x36: ('Filter', None),
+    0x37: ('Record', None),
+    0x38: ('FilterType', None),
+    0x39: ('SourceParent', None),
+    0x3A: ('TargetParent', None),
+    0x3B: ('Move', None),
+    0x3C: ('Correlator', None)
+})
+
+_metinf = dict(syncml11._metinf)
+_metinf.update({
+    0x16: ('FieldLevel', None)
+})
+
+encoding = {
+    # The XML application's DTD string.
+    'dtd': r'SyncML PUBLIC "-//SYNCML//DTD SyncML 1.2//EN" "http://www.openmobilealliance.org/tech/DTD/OMA-TS-SyncML_RepPro_DTD-V1_2.dtd"',
+
+    # Opaque data may hold device information documents, to be decoded.
+    'nested': True,
+
+    # Token codes for the XML application's elements.
+    'elements': [
+        _syncml,
+        _metinf
+    ]
+}
@@ -0,0 +1,92 @@
+#coding=utf-8
+
+r'''Tests of batch decoding.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+import dewbxml
+import provisioning
+
+from dewbxml import batch, parsebatch, wbxmlelement
+from enwbxml import wbxmlencoder
+
+from os       import environ, listdir, makedirs
+from os.path  import isdir, isfile, join
+from shutil   import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase, main
+
+
+class testbatch(TestCase):
+    def setUp(self):
+        self.folder = mkdtemp()
+        data = wbxmlencoder(0x0B).encode(wbxmlelement('wap-provisioningdoc'))
+        for name in ('a', 'b'):
+            makedirs(join(self.folder, name))
+            with open(join(self.folder, name, 'x.wbxml'), 'wb') as file:
+                file.write(data)
+
+    def tearDown(self):
+        rmtree(self.folder)
+
+    def test_glob_keeps_relative_paths(self):
+        output = join(self.folder, 'out')
+        results = list(parsebatch([join(self.folder, '*', 'x.wbxml')], output, 1))
+        self.assertEqual([error for (binary, plain, error) in results], [None, None])
+        self.assertTrue(isfile(join(output, 'a', 'x.xml')))
+        self.assertTrue(isfile(join(output, 'b', 'x.xml')))
+
+    def test_manifest_keeps_relative_paths(self):
+        manifest = join(self.folder, 'inputs.txt')
+        with open(manifest, 'w') as file:
+            file.write(join(self.folder, 'a', 'x.wbxml') + '\n' + join(self.folder, 'b', 'x.wbxml') + '\n')
+
+        output = join(self.folder, 'out')
+        list(parsebatch(['@' + manifest], output, 1))
+        self.assertTrue(isfile(join(output, 'a', 'x.xml')))
+        self.assertTrue(isfile(join(output, 'b', 'x.xml')))
+
+    def test_colliding_outputs_are_rejected(self):
+        inputs = [join(self.folder, 'a'), join(self.folder, 'b')]
+        with self.assertRaises(ValueError):
+            list(parsebatch(inputs, join(self.folder, 'out'), 1))
+
+    def test_unknown_public_identifier(self):
+        inputs = [join(self.folder, 'a')]
+        with self.assertRaises(ValueError):
+            list(parsebatch(inputs, None, 1, publicids = [0x99]))
+
+        self.assertFalse(isfile(join(self.folder, 'a', 'x.xml')))
+        self.assertEqual(batch(['-j', '1', '-p', '0x99'] + inputs), 1)
+
+    def test_compiled_is_opt_in(self):
+        cache = join(self.folder, 'cache')
+        environ['DEWBXML_CACHE'] = cache
+        dewbxml._decoders.clear()
+        try:
+            inputs = [join(self.folder, 'a')]
+            list(parsebatch(inputs, None, 1))
+            self.assertFalse(isdir(cache))
+
+            results = list(parsebatch(inputs, None, 1, compiled = True))
+            self.assertEqual([error for (binary, plain, error) in results], [None])
+            self.assertEqual([name for name in listdir(cache) if name.endswith('.py')], [
+                '_dewbxml_' + dewbxml._spechash(provisioning.encoding) + '.py'
+            ])
+        finally:
+            del environ['DEWBXML_CACHE']
+            dewbxml._decoders.clear()
+
+
+if __name__ == '__main__':
+    main()
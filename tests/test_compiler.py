@@ -0,0 +1,87 @@
+#coding=utf-8
+
+r'''Tests of compiled decoders and their cache.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+import dewbxml
+import wml13
+
+from dewbxml import wbxmlcompiler, wbxmlelement, wbxmlparser, wbxmlstring
+from enwbxml import wbxmlencoder
+
+from os        import listdir
+from shutil    import rmtree
+from tempfile  import mkdtemp
+from threading import Thread
+from unittest  import TestCase, main
+
+
+def _document():
+    r'''Returns a WML document using attribute prefixes and value tokens.
+    '''
+    root = wbxmlelement('wml')
+    card = wbxmlelement('card', {'id': 'main', 'title': 'Home'})
+    link = wbxmlelement('a', {'href': 'http://www.example.com/'})
+    link.addchild(wbxmlstring('Example'))
+    card.addchild(link)
+    root.addchild(card)
+    return wbxmlencoder(0x04).encode(root)
+
+
+class testcompiler(TestCase):
+    def setUp(self):
+        self.cache = mkdtemp()
+        dewbxml._decoders.clear()
+
+    def tearDown(self):
+        rmtree(self.cache)
+        dewbxml._decoders.clear()
+
+    def test_same_output_as_generic(self):
+        data = _document()
+        compiled = wbxmlparser(compiler = wbxmlcompiler(self.cache))
+        self.assertEqual(str(compiled.parse(data, True)), str(wbxmlparser().parse(data, True)))
+        self.assertEqual([name for name in listdir(self.cache) if name.endswith('.py')], [
+            '_dewbxml_' + dewbxml._spechash(wml13.encoding) + '.py'
+        ])
+
+    def test_hash_covers_template(self):
+        digest = dewbxml._spechash(wml13.encoding)
+        template = dewbxml._decodertemplate
+        try:
+            dewbxml._decodertemplate = template[:-1] + (template[-1] + '\n',)
+            self.assertNotEqual(dewbxml._spechash(wml13.encoding), digest)
+        finally:
+            dewbxml._decodertemplate = template
+
+        self.assertEqual(dewbxml._spechash(wml13.encoding), digest)
+
+    def test_concurrent_compilation(self):
+        decoders = []
+        def compile():
+            decoders.append(wbxmlcompiler(self.cache).compile(wml13.encoding))
+
+        threads = [Thread(target = compile) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(decoders), 8)
+        self.assertTrue(all(callable(decoder) for decoder in decoders))
+        self.assertEqual(len(listdir(self.cache)), 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#coding=utf-8
+
+r'''Tests of the WBXML decoder.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+import os
+
+from dewbxml import wbxmlcompiler, wbxmlerror, wbxmlfeedparser, wbxmlparser
+
+from os.path   import join
+from pathlib   import Path
+from shutil    import rmtree
+from tempfile  import mkdtemp
+from threading import Thread
+from unittest  import TestCase, main, skipUnless
+
+
+# Application with the same tag code on two pages, each with an attribute.
+_paged = {
+    'dtd': r'a PUBLIC "-//TEST//DTD Paged//EN" ""',
+    'elements': [
+        { # Page 0
+            0x05: ('a', {0x05: ('x', None)})
+        },
+
+        { # Page 1
+            0x05: ('b', {0x05: ('y', None)})
+        }
+    ]
+}
+
+
+def _names(node):
+    r'''Returns the element names of a DOM tree, in document order.
+    '''
+    names = [node.name]
+    for child in node.children:
+        names.extend(_names(child))
+
+    return names
+
+
+class testcodepages(TestCase):
+    def setUp(self):
+        self.cache = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.cache)
+
+    def parsers(self, applications = {}):
+        return [
+            wbxmlparser(applications),
+            wbxmlparser(applications, compiler = wbxmlcompiler(self.cache))
+        ]
+
+    def test_switch_page_in_content(self):
+        # AirSync:Sync > Email:Subject, AirSync:SyncKey
+        data = bytes(bytearray([
+            0x03, 0x01, 0x6A, 0x00,
+            0x45,
+                0x00, 0x02, 0x14,
+                0x00, 0x00, 0x0B,
+            0x01
+        ]))
+
+        for parser in self.parsers():
+            doc = parser.parse(data, True)
+            self.assertEqual(_names(doc.root), ['AirSync:Sync', 'Email:Subject', 'AirSync:SyncKey'])
+
+        names = [value.name for (event, value) in wbxmlparser().iterparse(data) if event == 'start']
+        self.assertEqual(names, ['AirSync:Sync', 'Email:Subject', 'AirSync:SyncKey'])
+
+    def test_attribute_page_is_independent(self):
+        # <a y="v"><a/><b/></a>: switching the attribute page to 1 leaves the
+        # tag page at 0.
+        data = bytes(bytearray([
+            0x03, 0x01, 0x6A, 0x00,
+            0xC5, 0x00, 0x01, 0x05, 0x03, ord('v'), 0x00, 0x01,
+                0x05,
+                0x00, 0x01, 0x05,
+            0x01
+        ]))
+
+        for parser in self.parsers({0x01: _paged}):
+            doc = parser.parse(data, True)
+            self.assertEqual(doc.root.attributes, {'y': 'v'})
+            self.assertEqual(_names(doc.root), ['a', 'a', 'b'])
+
+
+
+# Provisioning document header, with an empty string table.
+_header = [0x03, 0x0B, 0x6A, 0x00]
+
+
+class testerrors(TestCase):
+    def check(self, body):
+        data = bytes(bytearray(_header + body))
+        with self.assertRaises(wbxmlerror):
+            wbxmlparser().parse(data, True)
+
+        with self.assertRaises(wbxmlerror):
+            list(wbxmlparser().iterparse(data))
+
+        with self.assertRaises(wbxmlerror):
+            wbxmlfeedparser().feed(data)
+
+    def test_string_table_offset(self):
+        self.check([0x45, 0x83, 0x05, 0x01])
+
+    def test_integer_overflow(self):
+        self.check([0x45, 0x83, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x7F, 0x01])
+
+    def test_long_path_is_truncated(self):
+        data = bytes(bytearray(_header + [0x45] + [0x46] * 2000))
+        with self.assertRaises(wbxmlerror) as caught:
+            wbxmlparser(maxdepth = 1000).parse(data, True)
+
+        self.assertGreaterEqual(len(caught.exception.path), 1000)
+        self.assertLess(len(str(caught.exception)), 200)
+
+
+
+class testintegers(TestCase):
+    def setUp(self):
+        self.cache = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.cache)
+
+    def test_long_string_table(self):
+        # 200-byte string table, referenced at offsets 0 and 150, with
+        # opaque data 300 bytes long. Each length and offset takes two bytes.
+        table = [ord('a')] * 149 + [0x00] + [ord('b')] * 49 + [0x00]
+        data = bytes(bytearray(
+            [0x03, 0x0B, 0x6A, 0x81, 0x48] + table +
+            [0x45, 0x83, 0x00, 0x83, 0x81, 0x16, 0xC3, 0x82, 0x2C] + [ord('c')] * 300 + [0x01]
+        ))
+
+        for parser in (wbxmlparser(opaque = 'raw'), wbxmlparser(opaque = 'raw', compiler = wbxmlcompiler(self.cache))):
+            doc = parser.parse(data, True)
+            self.assertEqual(len(doc.stringtable), 2)
+            (first, second, opaque) = doc.root.children
+            self.assertEqual(first.value, 149 * 'a')
+            self.assertEqual(second.value, 49 * 'b')
+            self.assertEqual(opaque.data, 300 * b'c')
+
+        events = [(event, value) for (event, value) in wbxmlparser().iterparse(data) if event in ('text', 'opaque')]
+        self.assertEqual([event for (event, value) in events], ['text', 'text', 'opaque'])
+        self.assertEqual(events[1][1], 49 * 'b')
+        self.assertEqual(events[2][1].data, 300 * b'c')
+
+
+
+class testinput(TestCase):
+    def test_memoryview_in_place(self):
+        # <wap-provisioningdoc> with opaque data "ab"
+        data = bytearray(_header + [0x45, 0xC3, 0x02, ord('a'), ord('b'), 0x01])
+        doc = wbxmlparser(opaque = 'raw').parsestring(memoryview(data), True)
+        data[-3] = ord('x')
+        self.assertEqual(doc.root.children[0].data, b'xb')
+
+    def test_str_rejected(self):
+        with self.assertRaises(TypeError):
+            wbxmlparser().parsestring('\x03\x0b\x6a\x00')
+
+        with self.assertRaises(TypeError):
+            wbxmlparser().parsestring(Path('prov.wbxml'))
+
+    def test_path_object(self):
+        folder = mkdtemp()
+        try:
+            path = Path(folder) / 'prov.wbxml'
+            path.write_bytes(bytes(bytearray(_header + [0x05])))
+            doc = wbxmlparser().parse(path, True)
+        finally:
+            rmtree(folder)
+
+        self.assertEqual(doc.version, '1.3')
+        self.assertEqual(doc.root.name, 'wap-provisioningdoc')
+
+    @skipUnless(hasattr(os, 'mkfifo'), 'named pipes not supported')
+    def test_pipe(self):
+        # Pipes report a size of 0, and are written to in several chunks.
+        data = bytes(bytearray(_header + [0xC5, 0x45, 0x03] + [ord('x')] * 70000 + [0x00, 0x01, 0x01]))
+        folder = mkdtemp()
+        try:
+            path = join(folder, 'pipe')
+            os.mkfifo(path)
+
+            def write():
+                with open(path, 'wb') as file:
+                    file.write(data[:2])
+                    file.flush()
+                    file.write(data[2:])
+
+            writer = Thread(target = write)
+            writer.start()
+            doc = wbxmlparser().parse(path, True)
+            writer.join()
+        finally:
+            rmtree(folder)
+
+        self.assertEqual(doc.root.attributes, {'version': 70000 * 'x'})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#coding=utf-8
+
+r'''Tests of the WBXML encoder.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+from dewbxml import wbxmlelement, wbxmlparser, wbxmlstring
+from enwbxml import parsexml, wbxmlencoder
+
+from unittest import TestCase, main
+
+
+_prov = r'wap-provisioningdoc PUBLIC "-//WAPFORUM//DTD PROV 1.0//EN" "http://www.wapforum.org/DTD/prov.dtd"'
+
+
+def _document(encoding, value):
+    r'''Returns a provisioning document in plain XML, declared in the given
+        encoding, with a parameter of the given value.
+    '''
+    return (
+        '<?xml version="1.0" encoding="' + encoding + '"?>\n' +
+        '<!DOCTYPE ' + _prov + '>\n' +
+        '<wap-provisioningdoc><characteristic type="NAPDEF">' +
+        '<parm name="NAME" value="' + value + '"/>' +
+        '</characteristic></wap-provisioningdoc>\n'
+    )
+
+
+class testencoder(TestCase):
+    def test_roundtrip(self):
+        root = wbxmlelement('wml')
+        card = wbxmlelement('card', {'id': 'main', 'title': 'Home'})
+        para = wbxmlelement('p')
+        para.addchild(wbxmlstring('Hello'))
+        card.addchild(para)
+        root.addchild(card)
+
+        encoder = wbxmlencoder(0x04)
+        for optimize in (False, True):
+            data = encoder.encode(root, optimize)
+            doc = wbxmlparser().parse(data, True)
+            self.assertEqual(str(doc.root), str(root))
+            self.assertEqual(encoder.encode(doc.root, optimize), data)
+
+    def test_optimize_not_larger(self):
+        root = wbxmlelement('wml')
+        card = wbxmlelement('card')
+        root.addchild(card)
+        for i in range(300):
+            link = wbxmlelement('a', {'href': 'https://site' + str(i % 7) + '.org/' + 'x' * (i % 3 * 60)})
+            link.addchild(wbxmlstring('link' + str(i % 5)))
+            card.addchild(link)
+
+        encoder = wbxmlencoder(0x04)
+        optimized = encoder.encode(root, True)
+        self.assertLessEqual(len(optimized), len(encoder.encode(root)))
+        self.assertEqual(str(wbxmlparser().parse(optimized, True).root), str(root))
+
+    def test_xml_roundtrip_escapes(self):
+        root = wbxmlelement('wml')
+        card = wbxmlelement('card', {'title': 'A&B "quoted" <tag>'})
+        para = wbxmlelement('p')
+        para.addchild(wbxmlstring('x < y & y > z'))
+        card.addchild(para)
+        root.addchild(card)
+
+        encoder = wbxmlencoder(0x04)
+        data = encoder.encode(root)
+        doc = parsexml(str(wbxmlparser().parse(data, True)))
+        self.assertEqual(doc.root.children[0].attributes['title'], 'A&B "quoted" <tag>')
+        self.assertEqual(doc.root.children[0].children[0].children[0].value, 'x < y & y > z')
+        self.assertEqual(encoder.encode(doc), data)
+
+    def test_charset_alias(self):
+        doc = parsexml(_document('ISO-8859-1', 'Caf\xe9'))
+        data = wbxmlencoder(0x0B).encode(doc)
+        self.assertEqual(data[2], 0x04)
+
+        doc = wbxmlparser().parse(data, True)
+        parm = doc.root.children[0].children[0]
+        self.assertEqual(parm.attributes['value'], 'Caf\xe9')
+
+    def test_version_10_roundtrip(self):
+        # WBXML 1.0 documents have no charset field.
+        data = bytes(bytearray([0x00, 0x0B, 0x00, 0x85, 0x46, 0x01]))
+        doc = wbxmlparser().parse(data, True)
+        self.assertEqual(doc.version, '1.0')
+
+        encoded = wbxmlencoder(0x0B).encode(doc)
+        self.assertEqual(encoded, data)
+        self.assertEqual(str(wbxmlparser().parse(encoded, True)), str(doc))
+
+    def test_unknown_charset(self):
+        doc = parsexml(_document('koi8-r', 'x'))
+        with self.assertRaises(KeyError):
+            wbxmlencoder(0x0B).encode(doc)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#coding=utf-8
+
+r'''Tests of the push parser.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+from dewbxml import wbxmlelement, wbxmlerror, wbxmlfeedparser, wbxmlopaque, wbxmlparser, wbxmlstring
+from enwbxml import wbxmlencoder
+
+from unittest import TestCase, main
+
+
+def _document():
+    r'''Returns a provisioning document with strings, string table
+        references, opaque data and attributes.
+    '''
+    root = wbxmlelement('wap-provisioningdoc')
+    for i in range(3):
+        characteristic = wbxmlelement('characteristic', {'type': 'NAPDEF'})
+        parm = wbxmlelement('parm', {'name': 'NAME', 'value': 'Internet access point'})
+        characteristic.addchild(parm)
+        root.addchild(characteristic)
+
+    parm = wbxmlelement('parm', {'name': 'NAME'})
+    parm.addchild(wbxmlstring('text'))
+    parm.addchild(wbxmlopaque(b'\x00\x01\x02'))
+    root.addchild(parm)
+    return wbxmlencoder(0x0B).encode(root)
+
+
+class testfeedparser(TestCase):
+    def test_chunks(self):
+        data = _document()
+        expected = str(wbxmlparser().parse(data, True))
+        events = [event for (event, value) in wbxmlparser().iterparse(data)]
+        for size in (1, 2, 7, len(data)):
+            feeder = wbxmlfeedparser(tree = True)
+            received = []
+            for i in range(0, len(data), size):
+                feeder.feed(data[i:i + size])
+                received.extend(event for (event, value) in feeder.events())
+
+            self.assertEqual(str(feeder.close()), expected)
+            self.assertEqual(received, events)
+
+    def test_incomplete(self):
+        data = _document()
+        feeder = wbxmlfeedparser()
+        feeder.feed(data[:-1])
+        with self.assertRaises(wbxmlerror):
+            feeder.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#coding=utf-8
+
+r'''Tests of the decoding of WBXML documents nested in opaque data.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+import dewbxml
+
+from dewbxml import wbxmlcompiler, wbxmlparser
+
+from shutil   import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase, main
+
+
+def _mbint(value):
+    r'''Encodes an integer as a WBXML multi-byte integer.
+    '''
+    data = [value & 0x7F]
+    value >>= 7
+    while value > 0:
+        data.insert(0, 0x80 | (value & 0x7F))
+        value >>= 7
+
+    return bytes(data)
+
+
+def _document(publicid, body):
+    r'''Returns a WBXML 1.2 document in UTF-8, with the given public
+        identifier and body and no string table.
+    '''
+    return b'\x02' + _mbint(publicid) + b'\x6A\x00' + body
+
+
+def _syncml(publicid, payload):
+    r'''Returns a SyncML document with the given opaque data in a Data element.
+    '''
+    return _document(publicid, b'\x6D\x4F\xC3' + _mbint(len(payload)) + payload + b'\x01\x01')
+
+
+# DevInf 1.1 document with a single Man element.
+_devinf = _document(0x0FD4, b'\x4A\x51\x03Acme\x00\x01\x01')
+
+
+class testnested(TestCase):
+    def setUp(self):
+        self.cache = mkdtemp()
+        dewbxml._decoders.clear()
+
+    def tearDown(self):
+        rmtree(self.cache)
+        dewbxml._decoders.clear()
+
+    def test_public_identifiers(self):
+        parser = wbxmlparser()
+        for (publicid, fpi) in [
+            (0x0FD3, '-//SYNCML//DTD SyncML 1.1//EN'),
+            (0x0FD4, '-//SYNCML//DTD DevInf 1.1//EN'),
+            (0x1201, '-//SYNCML//DTD SyncML 1.2//EN'),
+            (0x1203, '-//SYNCML//DTD DevInf 1.2//EN')
+        ]:
+            document = parser.parse(_document(publicid, b'\x05'), True)
+            self.assertTrue(fpi in document.schema)
+
+        # SyncML 1.2 defines tags missing from SyncML 1.1, such as Move.
+        document = parser.parse(b'\x02\xA4\x01\x6A\x00\x6D\x3B\x01', True)
+        self.assertEqual(document.root.children[0].name, 'Move')
+
+    def test_lazy_decoding(self):
+        data = _syncml(0x0FD3, _devinf)
+        for parser in [wbxmlparser(), wbxmlparser(compiler = wbxmlcompiler(self.cache))]:
+            document = parser.parse(data, True)
+            opaque = document.root.children[0].children[0]
+            self.assertEqual(opaque._wbxmlopaque__document, False)
+            self.assertEqual(opaque.document.root.name, 'DevInf')
+            self.assertTrue('<Man>' in str(document))
+
+    def test_disabled(self):
+        document = wbxmlparser(nested = False).parse(_syncml(0x1201, _devinf), True)
+        self.assertEqual(document.root.children[0].children[0].document, None)
+        self.assertFalse('DevInf' in str(document))
+
+    def test_application_opt_in(self):
+        # Provisioning doesn't enable nested decoding, so its opaque data is
+        # left encoded even if it holds a WBXML document.
+        data = _document(0x0B, b'\x45\xC3' + _mbint(len(_devinf)) + _devinf + b'\x01')
+        document = wbxmlparser().parse(data, True)
+        self.assertEqual(document.root.children[0].document, None)
+
+        events = [value for (event, value) in wbxmlparser().iterparse(data) if event == 'opaque']
+        self.assertEqual(events[0].document, None)
+
+    def test_nesting_limit(self):
+        data = _devinf
+        for i in range(3000):
+            data = _syncml(0x0FD3, data)
+
+        text = str(wbxmlparser().parse(data, True))
+        self.assertEqual(text.count('<SyncML>'), dewbxml._maxnesting + 1)
+        self.assertFalse('DevInf' in text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#coding=utf-8
+
+r'''Tests of the application registry.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+from dewbxml import wbxmlparser, wbxmlregistry
+
+from threading import Thread
+from time      import sleep
+from unittest  import TestCase, main
+
+
+_prov = '-//WAPFORUM//DTD PROV 1.0//EN'
+
+_test = {
+    'dtd': r'test PUBLIC "-//TEST//DTD Test 1.0//EN" ""',
+    'elements': [
+        { # Page 0
+            0x05: ('test', None)
+        }
+    ]
+}
+
+
+class _entrypoint(object):
+    r'''Stand-in for a plugin entry point, counting how often it's loaded.
+    '''
+    def __init__(self, encoding, delay = 0):
+        self.encoding = encoding
+        self.delay = delay
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        sleep(self.delay)
+        return self.encoding
+
+
+class testregistry(TestCase):
+    def test_static_alias_loads_nothing(self):
+        point = _entrypoint(_test)
+        registry = wbxmlregistry({0x0B: 'provisioning', _prov: 0x0B, 0x70: point})
+        self.assertEqual(registry.resolve(_prov), 0x0B)
+        self.assertEqual(registry.resolve(0x70), 0x70)
+        self.assertEqual(point.loads, 0)
+
+    def test_fpi_of_unloaded_application(self):
+        point = _entrypoint(_test)
+        registry = wbxmlregistry({0x0B: 'provisioning', _prov: 0x0B, 0x70: point})
+        self.assertEqual(registry.resolve('-//TEST//DTD Test 1.0//EN'), 0x70)
+        self.assertEqual(point.loads, 1)
+
+        with self.assertRaises(KeyError):
+            registry.resolve('-//TEST//DTD Other 1.0//EN')
+        self.assertEqual(point.loads, 1)
+
+    def test_lazy_loading(self):
+        point = _entrypoint(_test)
+        registry = wbxmlregistry({0x70: point})
+        self.assertTrue(0x70 in registry)
+        self.assertEqual(point.loads, 0)
+
+        application = registry.application(0x70)
+        self.assertIs(registry.application(0x70), application)
+        self.assertEqual(point.loads, 1)
+
+    def test_string_public_identifier(self):
+        # Public identifier given as offset 0 of the string table.
+        table = bytearray(_prov.encode('ascii') + b'\x00')
+        data = bytes(bytearray([0x03, 0x00, 0x00, 0x6A, len(table)]) + table + bytearray([0x05]))
+        doc = wbxmlparser().parse(data, True)
+        self.assertEqual(doc.root.name, 'wap-provisioningdoc')
+
+    def test_concurrent_indexing(self):
+        # Threads looking up an FPI while another loads applications to match
+        # it wait for loading to finish.
+        registry = wbxmlregistry({0x70: _entrypoint(_test, 0.2)})
+        results = []
+
+        def resolve():
+            try:
+                results.append(registry.resolve('-//TEST//DTD Test 1.0//EN'))
+            except KeyError as e:
+                results.append(e)
+
+        threads = [Thread(target = resolve) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [0x70] * 4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#coding=utf-8
+
+r'''Tests of the decoding statistics collected by wbxmlstats objects.
+'''
+
+__license__ = r'''
+Copyright (c) 2025 Helio Perroni Filho
+
+This file is part of DeWBXML.
+
+DeWBXML is distributed under the terms of the MIT License.
+
+You should have received a copy of the MIT License along with
+DeWBXML. If not, see <https://choosealicense.com/licenses/mit/>.
+'''
+
+from dewbxml import wbxmlparser, wbxmlstats
+
+from unittest import TestCase, main
+
+
+# Application with two code pages and a value token valid for all attributes.
+_test = {
+    'dtd': r'a PUBLIC "-//TEST//DTD Stats//EN" ""',
+    'values': {
+        0x85: '.com'
+    },
+    'elements': [
+        { # Page 0
+            0x05: ('a', {0x05: ('x', None)}),
+            0x06: ('c', None)
+        },
+
+        { # Page 1
+            0x05: ('b', {0x05: ('y', None)})
+        }
+    ]
+}
+
+# <a x="v.com" y="ab">cdab<c/><b/>(opaque "zz")w</a>, with string table
+# "ab\0cd\0". The attribute list switches to attribute page 1 for y, and the
+# contents switch to tag page 1 for b.
+_document = bytes(bytearray([
+    0x03, 0x01, 0x6A, 0x06, ord('a'), ord('b'), 0x00, ord('c'), ord('d'), 0x00,
+    0xC5,
+        0x05, 0x03, ord('v'), 0x00, 0x85,
+        0x00, 0x01, 0x05, 0x83, 0x00,
+    0x01,
+        0x83, 0x03,
+        0x83, 0x00,
+        0x06,
+        0x00, 0x01, 0x05,
+        0xC3, 0x02, ord('z'), ord('z'),
+        0x03, ord('w'), 0x00,
+    0x01
+]))
+
+
+class teststats(TestCase):
+    def setUp(self):
+        self.parser = wbxmlparser({0x01: _test})
+
+    def test_counts(self):
+        stats = wbxmlstats()
+        doc = self.parser.parse(_document, True, stats)
+        self.assertEqual(str(doc), str(self.parser.parse(_document, True)))
+        self.assertEqual(doc.root.attributes, {'x': 'v.com', 'y': 'ab'})
+
+        self.assertEqual(stats.documents, 1)
+        self.assertEqual(stats.bytes, len(_document))
+        self.assertEqual(stats.tokens, {
+            'elements': 3,
+            'attributes': 2,
+            'values': 1,
+            'STR_I': 2,
+            'STR_T': 3,
+            'OPAQUE': 1,
+            'SWITCH_PAGE': 2
+        })
+        self.assertEqual(stats.hits, {0: 2, 3: 1})
+        self.assertEqual(sorted(stats.phases), ['body', 'charset', 'publicid', 'stringtable', 'version'])
+        self.assertTrue(all(time >= 0 for time in stats.phases.values()))
+
+    def test_accumulation(self):
+        stats = wbxmlstats()
+        self.parser.parse(_document, True, stats)
+        self.parser.parsestring(_document, True, stats)
+
+        self.assertEqual(stats.documents, 2)
+        self.assertEqual(stats.bytes, 2 * len(_document))
+        self.assertEqual(stats.tokens['elements'], 6)
+        self.assertEqual(stats.tokens['SWITCH_PAGE'], 4)
+        self.assertEqual(stats.hits, {0: 4, 3: 2})
+
+
+if __name__ == '__main__':
+    main()
@@ -28,40 +28,44 @@ __version__ = '1.0.0'
 #EXT_2   = 0xC2 # Reserved for future use.
 
 
-#TODO: Figure out what to do with the attribute value tokens:
-#0x85: '.com/',
-#0x86: '.edu/',
-#0x87: '.net/',
-#0x88: '.org/',
-#0x89: 'accept',
-#0x8A: 'bottom',
-#0x8B: 'clear',
-#0x8C: 'delete',
-#0x8D: 'help',
-#0x8E: 'http://',
-#0x8F: 'http://www.',
-#0x90: 'https://',
-#0x91: 'https://www.',
-#0x93: 'middle',
-#0x94: 'nowrap',
-#0x96: 'onenterbackward',
-#0x97: 'onenterforward',
-#0x95: 'onpick',
-#0x98: 'ontimer',
-#0x99: 'options',
-#0x9A: 'password',
-#0x9B: 'reset',
-#0x9D: 'text',
-#0x9E: 'top',
-#0x9F: 'unknown',
-#0xA0: 'wrap',
-#0xA1: 'Www.',
+_values = {
+    0x85: '.com/',
+    0x86: '.edu/',
+    0x87: '.net/',
+    0x88: '.org/',
+    0x89: 'accept',
+    0x8A: 'bottom',
+    0x8B: 'clear',
+    0x8C: 'delete',
+    0x8D: 'help',
+    0x8E: 'http://',
+    0x8F: 'http://www.',
+    0x90: 'https://',
+    0x91: 'https://www.',
+    0x93: 'middle',
+    0x94: 'nowrap',
+    0x95: 'onpick',
+    0x96: 'onenterbackward',
+    0x97: 'onenterforward',
+    0x98: 'ontimer',
+    0x99: 'options',
+    0x9A: 'password',
+    0x9B: 'reset',
+    0x9D: 'text',
+    0x9E: 'top',
+    0x9F: 'unknown',
+    0xA0: 'wrap',
+    0xA1: 'Www.'
+}
 
 
 encoding = {
     # The XML application's DTD string.
     'dtd': r'wml PUBLIC "-//WAPFORUM//DTD WML 1.3//EN" "http://www.wapforum.org/DTD/wml13.dtd"',
 
+    # Attribute value tokens, valid for all attributes.
+    'values': _values,
+
     # Token codes for the XML application's elements.
     'elements': [
         { # Page 0